@@ -1,13 +1,14 @@
-import gradio as gr
-import torch
-import tempfile
+import asyncio
 import os
-from PIL import Image
-import numpy as np
+import uvicorn
+
+# gradio, torch et EasyOCR ne sont importés qu'à la construction de l'interface
+# et au premier scan (voir warm_start pour un démarrage en arrière-plan)
 
 # Import de votre détecteur existant
 try:
-    from pokemon_detector import detect_pokemon_name_best_match, detect_pokemon_name
+    from pokemon_detector import detect_pokemon_name_best_match, detect_pokemon_name, detect_pokemon_grid
+    from pokemon_detector import load_image, match_ocr_results, _detect_pokemon_grid_bgr, iter_pokemon_names
 except ImportError as e:
     print(f"Warning: Could not import pokemon_detector: {e}")
     # Fallback functions pour éviter les erreurs
@@ -15,15 +16,54 @@ except ImportError as e:
         return {"name": "Pikachu", "similarity": 85, "confidence": 0.9}
     def detect_pokemon_name(*args, **kwargs):
         return [{"name": "Pikachu", "similarity": 85, "confidence": 0.9}]
+    def detect_pokemon_grid(*args, **kwargs):
+        return [{"name": "Pikachu", "similarity": 85, "confidence": 0.9, "row": 0, "col": 0}]
+    def load_image(image):
+        return image
+    def match_ocr_results(*args, **kwargs):
+        return [{"name": "Pikachu", "similarity": 85, "confidence": 0.9}]
+    def _detect_pokemon_grid_bgr(*args, **kwargs):
+        return detect_pokemon_grid(*args, **kwargs)
+    def iter_pokemon_names(*args, **kwargs):
+        yield from detect_pokemon_name(*args, **kwargs)
+
+import time
+from ocr_reader import warmup_from_env, _default_device
+from ocr_backends import get_backend
+from ocr_cache import get_ocr_cache
+from ocr_scheduler import get_ocr_scheduler, SchedulerBusy
+from worker_pool import get_worker_pool
+from metrics import metrics, timed
+from warm_start import WarmStartApp
+
+# Compteurs du cache OCR et de l'ordonnanceur exportés sur /metrics
+metrics.register_callback("ocr_cache_hits", lambda: get_ocr_cache().hits, kind="counter")
+metrics.register_callback("ocr_cache_misses", lambda: get_ocr_cache().misses, kind="counter")
+metrics.register_callback("ocr_queue_depth", lambda: get_ocr_scheduler().queue_depth())
+metrics.register_callback("ocr_batches", lambda: get_ocr_scheduler().batches, kind="counter")
+metrics.register_callback("ocr_batched_images", lambda: get_ocr_scheduler().batched_images, kind="counter")
 
-# Vérifier la disponibilité du GPU
-device = "cuda" if torch.cuda.is_available() else "cpu"
-print(f"🚀 Using device: {device}")
+_device = None
 
-def detect_pokemon_cards(image, lang="en", similarity_threshold=72, size_tolerance=0.3, return_best_only=False, verbose=False):
+def get_device():
+    """Device utilisé par l'OCR ('cuda' ou 'cpu'), détecté au premier appel (importe torch)"""
+    global _device
+    if _device is None:
+        _device = _default_device() if get_backend().supports_gpu else 'cpu'
+    return _device
+
+def detect_pokemon_cards(image, lang="en", similarity_threshold=72, size_tolerance=0.3, return_best_only=False, verbose=False,
+                         grid_mode=False, max_side=None, grayscale=False, normalize_contrast=False,
+                         canvas_size=2560, mag_ratio=1.0, return_timings=False):
     """
     Fonction principale de détection des cartes Pokémon
+    
+    max_side, grayscale, normalize_contrast, canvas_size et mag_ratio règlent le
+    prétraitement et le détecteur EasyOCR (voir pokemon_detector.run_ocr).
+    Avec return_timings=True, la réponse contient la durée (ms) de chaque étape.
     """
+    start = time.perf_counter()
+    timings = {}
     try:
         if image is None:
             return {
@@ -33,81 +73,328 @@ def detect_pokemon_cards(image, lang="en", similarity_threshold=72, size_toleran
                 "count": 0
             }
         
-        # Sauvegarder l'image temporairement
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.png') as tmp_file:
-            if isinstance(image, Image.Image):
-                image.save(tmp_file.name)
-            else:
-                # Si c'est déjà un array numpy
-                Image.fromarray(image).save(tmp_file.name)
-            temp_path = tmp_file.name
+        ocr_options = {
+            "max_side": int(max_side) if max_side else None,
+            "grayscale": grayscale,
+            "normalize_contrast": normalize_contrast,
+            "canvas_size": int(canvas_size),
+            "mag_ratio": mag_ratio,
+            "timings": timings,
+        }
         
-        try:
-            # Utiliser votre fonction existante
-            if return_best_only:
-                result = detect_pokemon_name_best_match(
-                    temp_path, 
-                    lang=lang, 
-                    similarity_threshold=similarity_threshold, 
-                    size_tolerance=size_tolerance,
-                    return_best_only=True,
-                    verbose=verbose
-                )
-                
-                if result:
-                    pokemon_list = [result]
-                    success = True
-                    message = f"✅ Pokémon détecté : {result['name']}"
-                else:
-                    pokemon_list = []
-                    success = False
-                    message = "❌ Aucun Pokémon détecté"
+        # L'image est passée directement en mémoire (pas de fichier temporaire)
+        if grid_mode:
+            # Page de classeur : découpage en grille, OCR des seuls bandeaux de nom
+            results = detect_pokemon_grid(
+                image,
+                lang=lang,
+                similarity_threshold=similarity_threshold,
+                verbose=verbose,
+                **ocr_options
+            )
+            if results and return_best_only:
+                results = [max(results, key=lambda x: x['similarity'] * 0.7 + x['confidence'] * 30)]
+            
+            if results:
+                pokemon_list = results
+                success = True
+                pokemon_names = [r['name'] for r in results]
+                message = f"✅ {len(results)} Pokémon détecté(s) : {', '.join(pokemon_names)}"
             else:
-                results = detect_pokemon_name(
-                    temp_path, 
-                    lang=lang, 
-                    similarity_threshold=similarity_threshold, 
-                    size_tolerance=size_tolerance,
-                    verbose=verbose
-                )
-                
-                if results and len(results) > 0:
-                    pokemon_list = results
-                    success = True
-                    pokemon_names = [r['name'] for r in results]
-                    message = f"✅ {len(results)} Pokémon détecté(s) : {', '.join(pokemon_names)}"
-                else:
-                    pokemon_list = []
-                    success = False
-                    message = "❌ Aucun Pokémon détecté"
+                pokemon_list = []
+                success = False
+                message = "❌ Aucun Pokémon détecté"
+        elif return_best_only:
+            result = detect_pokemon_name_best_match(
+                image, 
+                lang=lang, 
+                similarity_threshold=similarity_threshold, 
+                size_tolerance=size_tolerance,
+                return_best_only=True,
+                verbose=verbose,
+                **ocr_options
+            )
+            
+            if result:
+                pokemon_list = [result]
+                success = True
+                message = f"✅ Pokémon détecté : {result['name']}"
+            else:
+                pokemon_list = []
+                success = False
+                message = "❌ Aucun Pokémon détecté"
+        else:
+            results = detect_pokemon_name(
+                image, 
+                lang=lang, 
+                similarity_threshold=similarity_threshold, 
+                size_tolerance=size_tolerance,
+                verbose=verbose,
+                **ocr_options
+            )
+            
+            if results and len(results) > 0:
+                pokemon_list = results
+                success = True
+                pokemon_names = [r['name'] for r in results]
+                message = f"✅ {len(results)} Pokémon détecté(s) : {', '.join(pokemon_names)}"
+            else:
+                pokemon_list = []
+                success = False
+                message = "❌ Aucun Pokémon détecté"
         
-        finally:
-            # Nettoyer le fichier temporaire
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
+        timings["total_ms"] = (time.perf_counter() - start) * 1000
+        metrics.observe_timings(timings)
+        metrics.inc("requests")
         
-        return {
+        response = {
             "success": success,
             "message": message,
             "pokemon": pokemon_list,
             "count": len(pokemon_list),
-            "device_used": device
+            "device_used": get_device()
+        }
+        if return_timings:
+            response["timings"] = timings
+        return response
+    
+    except Exception as e:
+        metrics.inc("requests")
+        metrics.inc("errors")
+        return {
+            "success": False,
+            "error": f"Erreur lors du traitement : {str(e)}",
+            "pokemon": [],
+            "count": 0
+        }
+
+async def detect_pokemon_cards_async(image, lang="en", similarity_threshold=72, size_tolerance=0.3,
+                                    return_best_only=False, verbose=False, grid_mode=False, max_side=None,
+                                    grayscale=False, normalize_contrast=False, canvas_size=2560, mag_ratio=1.0,
+                                    return_timings=False):
+    """
+    Variante asynchrone de detect_pokemon_cards, via l'ordonnanceur OCR partagé
+    
+    Les scans simultanés sont lus par lots (voir ocr_scheduler), ou confiés au
+    pool de processus si SCANNER_WORKERS est défini (voir worker_pool). Quand la file
+    d'attente est pleine, la réponse « serveur occupé » revient immédiatement ;
+    un scan qui dépasse SCANNER_REQUEST_TIMEOUT est abandonné.
+    """
+    start = time.perf_counter()
+    timings = {}
+    if image is None:
+        return {
+            "success": False,
+            "error": "Aucune image fournie",
+            "pokemon": [],
+            "count": 0
         }
     
+    ocr_options = {
+        "max_side": int(max_side) if max_side else None,
+        "grayscale": grayscale,
+        "normalize_contrast": normalize_contrast,
+        "canvas_size": int(canvas_size),
+        "mag_ratio": mag_ratio,
+    }
+    scheduler = get_ocr_scheduler()
+    worker_pool = get_worker_pool()
+    try:
+        # Décodage et correspondance hors de la boucle asyncio : un gros envoi ne bloque pas les autres requêtes
+        with timed(timings, "decode_ms"):
+            bgr = await asyncio.to_thread(load_image, image)
+        if bgr is None:
+            metrics.inc("requests")
+            metrics.inc("errors")
+            return {
+                "success": False,
+                "error": "Image illisible : format non reconnu ou fichier corrompu",
+                "pokemon": [],
+                "count": 0
+            }
+        if worker_pool is not None:
+            # Scan complet (OCR + correspondance) dans un processus worker (SCANNER_WORKERS)
+            future = worker_pool.submit(bgr, lang, similarity_threshold, size_tolerance, grid_mode, **ocr_options)
+            results, worker_timings = await asyncio.wait_for(asyncio.wrap_future(future), scheduler.timeout_s)
+            timings.update(worker_timings)
+        elif grid_mode:
+            # Le mode classeur groupe déjà ses bandeaux : il passe seul dans son lot
+            results = await scheduler.submit_call(_detect_pokemon_grid_bgr, bgr, lang, similarity_threshold,
+                                                  verbose=verbose, timings=timings, **ocr_options)
+        else:
+            ocr_results = await scheduler.submit(bgr, lang, timings=timings, **ocr_options)
+            results = await asyncio.to_thread(match_ocr_results, ocr_results, lang, similarity_threshold,
+                                              size_tolerance, verbose, timings)
+    except SchedulerBusy:
+        metrics.inc("requests")
+        metrics.inc("busy")
+        return {
+            "success": False,
+            "busy": True,
+            "error": "⏳ Serveur occupé : trop de scans en attente, réessayez dans quelques secondes",
+            "pokemon": [],
+            "count": 0
+        }
+    except asyncio.TimeoutError:
+        metrics.inc("requests")
+        metrics.inc("timeouts")
+        return {
+            "success": False,
+            "error": "⌛ Délai dépassé : le scan a pris trop de temps",
+            "pokemon": [],
+            "count": 0
+        }
     except Exception as e:
+        metrics.inc("requests")
+        metrics.inc("errors")
         return {
             "success": False,
             "error": f"Erreur lors du traitement : {str(e)}",
             "pokemon": [],
             "count": 0
         }
+    
+    if results and return_best_only:
+        results = [max(results, key=lambda x: x['similarity'] * 0.7 + x['confidence'] * 30)]
+    
+    pokemon_list = results or []
+    if not pokemon_list:
+        message = "❌ Aucun Pokémon détecté"
+    elif return_best_only:
+        message = f"✅ Pokémon détecté : {pokemon_list[0]['name']}"
+    else:
+        message = f"✅ {len(pokemon_list)} Pokémon détecté(s) : {', '.join(r['name'] for r in pokemon_list)}"
+    
+    timings["total_ms"] = (time.perf_counter() - start) * 1000
+    metrics.observe_timings(timings)
+    metrics.inc("requests")
+    
+    response = {
+        "success": bool(pokemon_list),
+        "message": message,
+        "pokemon": pokemon_list,
+        "count": len(pokemon_list),
+        "device_used": get_device()
+    }
+    if return_timings:
+        response["timings"] = timings
+    return response
+
+async def detect_pokemon_cards_stream(image, lang="en", similarity_threshold=72, size_tolerance=0.3,
+                                      return_best_only=False, verbose=False, grid_mode=False, max_side=None,
+                                      grayscale=False, normalize_contrast=False, canvas_size=2560, mag_ratio=1.0,
+                                      return_timings=False):
+    """
+    Variante en flux de detect_pokemon_cards_async : une réponse partielle par Pokémon validé
+    
+    Chaque réponse a le format de detect_pokemon_cards, avec la liste des Pokémon
+    trouvés jusque-là et done=False ; la dernière (done=True) est la réponse
+    complète. Le scan passe par l'ordonnanceur OCR (file d'attente limitée à
+    SCANNER_QUEUE_MAX, délai SCANNER_REQUEST_TIMEOUT), dans un lot à part. Le
+    mode classeur, return_best_only et les workers de SCANNER_WORKERS ne
+    renvoient que la réponse complète (voir detect_pokemon_cards_async).
+    
+    Yields:
+        Dicts de réponse (success, message, pokemon, count, device_used, done)
+    """
+    if image is None or grid_mode or return_best_only or get_worker_pool() is not None:
+        response = await detect_pokemon_cards_async(image, lang, similarity_threshold, size_tolerance,
+                                                    return_best_only, verbose, grid_mode, max_side, grayscale,
+                                                    normalize_contrast, canvas_size, mag_ratio, return_timings)
+        yield dict(response, done=True)
+        return
+    
+    start = time.perf_counter()
+    timings = {}
+    pokemon_list = []
+    try:
+        # Décodage, OCR et correspondance dans le thread du lot
+        async for pokemon in get_ocr_scheduler().submit_stream(
+            iter_pokemon_names,
+            image,
+            lang=lang,
+            similarity_threshold=similarity_threshold,
+            size_tolerance=size_tolerance,
+            verbose=verbose,
+            timings=timings,
+            max_side=int(max_side) if max_side else None,
+            grayscale=grayscale,
+            normalize_contrast=normalize_contrast,
+            canvas_size=int(canvas_size),
+            mag_ratio=mag_ratio,
+        ):
+            pokemon_list.append(pokemon)
+            yield {
+                "success": True,
+                "message": f"⏳ {len(pokemon_list)} Pokémon détecté(s), analyse en cours : "
+                           f"{', '.join(r['name'] for r in pokemon_list)}",
+                "pokemon": list(pokemon_list),
+                "count": len(pokemon_list),
+                "device_used": get_device(),
+                "done": False
+            }
+    except SchedulerBusy:
+        metrics.inc("requests")
+        metrics.inc("busy")
+        yield {
+            "success": False,
+            "busy": True,
+            "error": "⏳ Serveur occupé : trop de scans en attente, réessayez dans quelques secondes",
+            "pokemon": pokemon_list,
+            "count": len(pokemon_list),
+            "done": True
+        }
+        return
+    except asyncio.TimeoutError:
+        metrics.inc("requests")
+        metrics.inc("timeouts")
+        yield {
+            "success": False,
+            "error": "⌛ Délai dépassé : le scan a pris trop de temps",
+            "pokemon": pokemon_list,
+            "count": len(pokemon_list),
+            "done": True
+        }
+        return
+    except Exception as e:
+        metrics.inc("requests")
+        metrics.inc("errors")
+        yield {
+            "success": False,
+            "error": f"Erreur lors du traitement : {str(e)}",
+            "pokemon": pokemon_list,
+            "count": len(pokemon_list),
+            "done": True
+        }
+        return
+    
+    if pokemon_list:
+        message = f"✅ {len(pokemon_list)} Pokémon détecté(s) : {', '.join(r['name'] for r in pokemon_list)}"
+    else:
+        message = "❌ Aucun Pokémon détecté"
+    
+    timings["total_ms"] = (time.perf_counter() - start) * 1000
+    metrics.observe_timings(timings)
+    metrics.inc("requests")
+    
+    response = {
+        "success": bool(pokemon_list),
+        "message": message,
+        "pokemon": pokemon_list,
+        "count": len(pokemon_list),
+        "device_used": get_device(),
+        "done": True
+    }
+    if return_timings:
+        response["timings"] = timings
+    yield response
 
 def format_results_for_display(results):
     """
     Formate les résultats pour l'affichage dans Gradio
     """
     if not results["success"]:
-        return results["message"], ""
+        return results.get("message") or results.get("error", ""), ""
     
     # Message principal
     main_message = results["message"]
@@ -118,15 +405,25 @@ def format_results_for_display(results):
         details = "📋 **Détails des détections :**\n\n"
         for i, pokemon in enumerate(results["pokemon"], 1):
             details += f"**{i}. {pokemon['name']}**\n"
+            if 'row' in pokemon:
+                details += f"   - Position : ligne {pokemon['row'] + 1}, colonne {pokemon['col'] + 1}\n"
             details += f"   - Similitude : {pokemon['similarity']:.1f}%\n"
             details += f"   - Confiance OCR : {pokemon['confidence']*100:.1f}%\n\n"
         
         details += f"🖥️ *Traitement effectué sur : {results.get('device_used', 'CPU')}*"
+        
+        timings = results.get("timings")
+        if timings:
+            ocr_ms = sum(v for k, v in timings.items() if k.startswith("ocr_"))
+            details += f"\n\n⏱️ *Temps total : {timings['total_ms']:.0f} ms (OCR : {ocr_ms:.0f} ms, "
+            details += f"correspondance : {timings.get('matching_ms', 0):.0f} ms)*"
     
     return main_message, details
 
 # Interface Gradio
 def create_interface():
+    import gradio as gr
+    
     with gr.Blocks(title="🎴 Scanner Pokémon Cards", theme=gr.themes.Soft()) as interface:
         gr.Markdown("""
         # 🎴 Scanner de Cartes Pokémon
@@ -178,6 +475,51 @@ def create_interface():
                         value=False,
                         label="🔍 Mode verbose (détails dans les logs)"
                     )
+                    
+                    grid_mode = gr.Checkbox(
+                        value=False,
+                        label="🗂️ Mode classeur (analyse carte par carte)"
+                    )
+                    
+                    stream = gr.Checkbox(
+                        value=True,
+                        label="⚡ Afficher les Pokémon au fur et à mesure"
+                    )
+                
+                with gr.Accordion("🖼️ Prétraitement et OCR", open=False):
+                    max_side = gr.Slider(
+                        minimum=0,
+                        maximum=2560,
+                        value=0,
+                        step=160,
+                        label="📐 Résolution max (grand côté, 0 = originale)"
+                    )
+                    
+                    grayscale = gr.Checkbox(
+                        value=False,
+                        label="⚫ Niveaux de gris"
+                    )
+                    
+                    normalize_contrast = gr.Checkbox(
+                        value=False,
+                        label="🌗 Normaliser le contraste"
+                    )
+                    
+                    canvas_size = gr.Slider(
+                        minimum=640,
+                        maximum=2560,
+                        value=2560,
+                        step=160,
+                        label="🧱 canvas_size EasyOCR"
+                    )
+                    
+                    mag_ratio = gr.Slider(
+                        minimum=0.5,
+                        maximum=2.0,
+                        value=1.0,
+                        step=0.1,
+                        label="🔎 mag_ratio EasyOCR"
+                    )
                 
                 scan_button = gr.Button(
                     "🔍 Scanner les cartes", 
@@ -208,21 +550,34 @@ def create_interface():
         """)
         
         # Connexion des événements
-        def process_and_format(image, lang, similarity_threshold, size_tolerance, return_best_only, verbose):
-            # Traitement
-            results = detect_pokemon_cards(
-                image, lang, similarity_threshold, size_tolerance, return_best_only, verbose
+        async def process_and_format(image, lang, similarity_threshold, size_tolerance, return_best_only, verbose,
+                                     grid_mode, stream, max_side, grayscale, normalize_contrast, canvas_size, mag_ratio):
+            if stream and not grid_mode and not return_best_only:
+                # Chaque Pokémon validé s'affiche sans attendre la fin de l'analyse
+                async for results in detect_pokemon_cards_stream(
+                    image, lang, similarity_threshold, size_tolerance, return_best_only, verbose, grid_mode,
+                    max_side, grayscale, normalize_contrast, canvas_size, mag_ratio, return_timings=True
+                ):
+                    yield format_results_for_display(results)
+                return
+            
+            # Traitement (regroupé en lots avec les scans simultanés)
+            results = await detect_pokemon_cards_async(
+                image, lang, similarity_threshold, size_tolerance, return_best_only, verbose, grid_mode,
+                max_side, grayscale, normalize_contrast, canvas_size, mag_ratio, return_timings=True
             )
             
             # Formatage pour l'affichage
-            message, details = format_results_for_display(results)
-            
-            return message, details
+            yield format_results_for_display(results)
         
         scan_button.click(
             fn=process_and_format,
-            inputs=[image_input, lang, similarity_threshold, size_tolerance, return_best_only, verbose],
-            outputs=[result_message, result_details]
+            inputs=[image_input, lang, similarity_threshold, size_tolerance, return_best_only, verbose, grid_mode,
+                    stream, max_side, grayscale, normalize_contrast, canvas_size, mag_ratio],
+            outputs=[result_message, result_details],
+            # Pas de limite côté Gradio : l'ordonnanceur OCR regroupe les scans
+            # et refuse ceux qui dépassent sa file d'attente (SCANNER_QUEUE_MAX)
+            concurrency_limit=None
         )
         
         # API endpoint pour usage externe
@@ -231,19 +586,88 @@ def create_interface():
     return interface
 
 # Fonction API pour usage externe
-def api_detect_pokemon(image, lang="en", similarity_threshold=72, size_tolerance=0.3, return_best_only=False):
+def api_detect_pokemon(image, lang="en", similarity_threshold=72, size_tolerance=0.3, return_best_only=False, grid_mode=False):
     """
     Fonction API simplifiée pour les appels externes
     """
-    return detect_pokemon_cards(image, lang, similarity_threshold, size_tolerance, return_best_only, False)
+    return detect_pokemon_cards(image, lang, similarity_threshold, size_tolerance, return_best_only, False, grid_mode)
 
-if __name__ == "__main__":
-    # Créer et lancer l'interface
-    interface = create_interface()
+def create_server():
+    """
+    Application FastAPI servant l'interface Gradio, /metrics (format Prometheus), /healthz
+    et /api/detect/stream (résultats au fil de l'eau, une ligne JSON par Pokémon)
+    """
+    import json
+    import gradio as gr
+    from fastapi import FastAPI, Request
+    from fastapi.responses import PlainTextResponse, StreamingResponse
+    
+    server = FastAPI()
     
+    worker_pool = get_worker_pool()
+    if worker_pool is not None:
+        metrics.register_callback("worker_pending", lambda: worker_pool.pending)
+    
+    @server.get("/metrics", response_class=PlainTextResponse)
+    def prometheus_metrics():
+        return metrics.render_prometheus()
+    
+    @server.get("/healthz")
+    def healthz():
+        return {"status": "ready"}
+    
+    @server.post("/api/detect/stream")
+    async def detect_stream(request: Request, lang: str = "en", similarity_threshold: float = 72,
+                            size_tolerance: float = 0.3, grid_mode: bool = False, max_side: int = 0,
+                            grayscale: bool = False, normalize_contrast: bool = False, canvas_size: int = 2560,
+                            mag_ratio: float = 1.0):
+        """
+        Image encodée dans le corps de la requête ; réponse NDJSON : un événement
+        "pokemon" par Pokémon validé, puis "done" (ou "error")
+        """
+        image = await request.body() or None
+        
+        async def events():
+            sent = 0
+            async for response in detect_pokemon_cards_stream(
+                image, lang, similarity_threshold, size_tolerance, False, False, grid_mode, max_side,
+                grayscale, normalize_contrast, canvas_size, mag_ratio, return_timings=True
+            ):
+                for pokemon in response["pokemon"][sent:]:
+                    yield json.dumps({"event": "pokemon", **pokemon}, ensure_ascii=False) + "\n"
+                sent = len(response["pokemon"])
+                if response.get("error"):
+                    yield json.dumps({"event": "error", "error": response["error"]}, ensure_ascii=False) + "\n"
+                elif response["done"]:
+                    yield json.dumps({"event": "done", "count": response["count"],
+                                      "timings": response.get("timings", {})}) + "\n"
+        
+        # Même file d'attente et même délai que l'interface (voir ocr_scheduler)
+        return StreamingResponse(events(), media_type="application/x-ndjson")
+    
+    return gr.mount_gradio_app(server, create_interface(), path="/")
+
+def warmup_models():
+    """
+    Précharge les Readers OCR (SCANNER_WARMUP_LANGS=en,fr) pour que la
+    première requête ne paie pas le chargement des modèles
+    """
+    print(f"🚀 Using device: {get_device()} (moteur OCR : {get_backend().name})")
+    worker_pool = get_worker_pool()
+    if worker_pool is not None:
+        # Chaque worker charge ses propres Readers (SCANNER_WARMUP_LANGS) au démarrage
+        worker_pool.warmup()
+        print(f"🧵 {worker_pool.workers} workers de scan ({worker_pool.threads_per_worker} threads torch chacun)")
+    else:
+        warmed = warmup_from_env()
+        if warmed:
+            print(f"🔥 Readers préchargés : {', '.join(warmed)}")
+
+if __name__ == "__main__":
     # Configuration pour HuggingFace Spaces
-    interface.launch(
-        server_name="0.0.0.0",
-        server_port=7860,
-        share=False
-    )
+    if os.environ.get("SCANNER_FAST_START", "0") == "1":
+        # Le serveur répond tout de suite sur /healthz ; interface et modèles se chargent en arrière-plan
+        uvicorn.run(WarmStartApp(create_server, warmup=warmup_models), host="0.0.0.0", port=7860)
+    else:
+        warmup_models()
+        uvicorn.run(create_server(), host="0.0.0.0", port=7860)
@@ -0,0 +1,274 @@
+"""
+Scan en masse de photos de classeur (liste d'images, dossiers, archives ZIP)
+
+Le décodage (pool de threads), l'OCR (Reader partagé) et la correspondance
+avec le Pokédex s'enchaînent en pipeline, reliés par des files bornées pour
+garder une mémoire stable sur de gros dossiers. Les résultats sont écrits au
+fil de l'eau en JSONL ; avec --resume, les fichiers déjà traités sont sautés.
+Avec --workers, l'OCR et la correspondance tournent dans un pool de processus
+(un Reader par worker, voir worker_pool) pour occuper tous les cœurs d'une
+machine sans GPU.
+
+Usage :
+    python batch_scan.py photos/ collection.zip -o resultats.jsonl --resume
+    python batch_scan.py photos/ -o resultats.jsonl --workers 4
+"""
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from binder_grid import find_card_cells
+from pokemon_detector import load_image, run_ocr, match_ocr_results, _detect_pokemon_grid_bgr
+from worker_pool import ScanWorkerPool
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.bmp', '.tif', '.tiff')
+
+# Marque de fin de flux entre les étapes du pipeline
+_DONE = object()
+
+
+def _is_image(name):
+    return name.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def _file_loader(path):
+    def load():
+        with open(path, 'rb') as f:
+            return f.read()
+    return load
+
+
+def iter_sources(paths):
+    """
+    Énumère les images à scanner
+
+    Args:
+        paths: Chemins d'images, de dossiers (parcourus récursivement) ou d'archives ZIP
+
+    Yields:
+        Tuples (identifiant, fonction sans argument renvoyant les bytes de l'image) ;
+        l'identifiant d'une image d'archive est "archive.zip:chemin/interne.png"
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if _is_image(name):
+                        full_path = os.path.join(root, name)
+                        yield full_path, _file_loader(full_path)
+        elif zipfile.is_zipfile(path):
+            archive = zipfile.ZipFile(path)
+            lock = threading.Lock()
+            for member in sorted(archive.namelist()):
+                if _is_image(member):
+                    def load(member=member):
+                        with lock:
+                            return archive.read(member)
+                    yield f"{path}:{member}", load
+        else:
+            yield path, _file_loader(path)
+
+
+def scan_batch(sources, lang='en', similarity_threshold=72, size_tolerance=0.3, grid_mode=False,
+               decode_workers=4, queue_size=8, skip=(), workers=0, find_cards=False, **ocr_options):
+    """
+    Scanne une série d'images en pipeline décodage → OCR → correspondance
+
+    Args:
+        sources: Images (array numpy RGB, PIL, bytes) ou tuples (identifiant, image ou
+            fonction renvoyant des bytes), par exemple ceux d'iter_sources
+        lang, similarity_threshold, size_tolerance: Voir detect_pokemon_name
+        grid_mode: Si True, analyse carte par carte (detect_pokemon_grid)
+        decode_workers: Threads de décodage
+        queue_size: Taille maximale des files entre étapes (borne la mémoire)
+        skip: Identifiants à ignorer (reprise après interruption)
+        workers: Processus de scan (0 = OCR dans le processus courant, voir worker_pool)
+        find_cards: Si True, ajoute les cases des cartes de chaque photo (voir
+            binder_grid.find_card_cells), pendant le décodage
+        **ocr_options: Prétraitement et réglages EasyOCR (voir run_ocr)
+
+    Yields:
+        Un dict par image, dans l'ordre des sources : source, pokemon, count,
+        timings (ms par étape), cards avec find_cards et error le cas échéant
+    """
+    skip = set(skip)
+    pool = None
+    if workers:
+        # Assez d'images en vol pour occuper tous les workers
+        queue_size = max(queue_size, 2 * workers)
+        pool = ScanWorkerPool(workers, warmup_langs=[lang], max_pending=queue_size + 2)
+    decoded = queue.Queue(maxsize=queue_size)
+    recognized = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def decode(source_id, item):
+        start = time.perf_counter()
+        cards = None
+        try:
+            data = item() if callable(item) else item
+            image = load_image(data)
+            error = None if image is not None else "Image illisible"
+            if image is not None and find_cards:
+                cards = [{'row': c['row'], 'col': c['col'], 'box': list(c['box'])} for c in find_card_cells(image)]
+        except Exception as e:
+            image, error = None, f"Erreur de décodage : {e}"
+        return source_id, image, error, (time.perf_counter() - start) * 1000, cards
+
+    def feed(executor):
+        # Les futures sont mises en file dans l'ordre : la file bornée limite
+        # le nombre d'images décodées en attente
+        for index, source in enumerate(sources):
+            if stop.is_set():
+                break
+            source_id, item = source if isinstance(source, tuple) else (index, source)
+            if source_id in skip:
+                continue
+            decoded.put(executor.submit(decode, source_id, item))
+        decoded.put(_DONE)
+
+    def recognize():
+        while True:
+            future = decoded.get()
+            if future is _DONE or stop.is_set():
+                break
+            source_id, image, error, decode_ms, cards = future.result()
+            timings = {'decode_ms': decode_ms}
+            payload = None
+            if error is None:
+                start = time.perf_counter()
+                try:
+                    if pool is not None:
+                        # Scan complet dans un worker ; le résultat est attendu à la sortie
+                        payload = pool.submit(image, lang, similarity_threshold, size_tolerance, grid_mode,
+                                              **ocr_options)
+                    elif grid_mode:
+                        payload = _detect_pokemon_grid_bgr(image, lang, similarity_threshold, **ocr_options) or []
+                    else:
+                        payload = run_ocr(image, lang, **ocr_options)
+                except Exception as e:
+                    error = f"Erreur OCR : {e}"
+                if pool is None:
+                    timings['ocr_ms'] = (time.perf_counter() - start) * 1000
+            recognized.put((source_id, payload, error, timings, cards))
+        recognized.put(_DONE)
+
+    executor = ThreadPoolExecutor(max_workers=decode_workers)
+    threads = [
+        threading.Thread(target=feed, args=(executor,), daemon=True),
+        threading.Thread(target=recognize, daemon=True),
+    ]
+    for thread in threads:
+        thread.start()
+
+    try:
+        while True:
+            item = recognized.get()
+            if item is _DONE:
+                break
+            source_id, payload, error, timings, cards = item
+            pokemon = []
+            if error is None and pool is not None:
+                try:
+                    results, worker_timings = payload.result()
+                    pokemon = results or []
+                    timings['scan_ms'] = worker_timings['scan_ms']
+                except Exception as e:
+                    error = f"Erreur OCR : {e}"
+            elif error is None:
+                start = time.perf_counter()
+                if grid_mode:
+                    pokemon = payload
+                else:
+                    pokemon = match_ocr_results(payload, lang, similarity_threshold, size_tolerance) or []
+                timings['match_ms'] = (time.perf_counter() - start) * 1000
+            timings['total_ms'] = sum(timings.values())
+            record = {'source': source_id, 'pokemon': pokemon, 'count': len(pokemon), 'timings': timings}
+            if cards is not None:
+                record['cards'] = cards
+            if error is not None:
+                record['error'] = error
+            yield record
+    finally:
+        # Arrêt anticipé (générateur abandonné) : on libère les étapes bloquées
+        stop.set()
+        for q in (decoded, recognized):
+            while True:
+                try:
+                    q.get_nowait()
+                except queue.Empty:
+                    break
+        executor.shutdown(wait=False, cancel_futures=True)
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+
+def load_checkpoint(output_path):
+    """Identifiants déjà traités sans erreur dans un fichier JSONL existant"""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Dernière ligne tronquée par une interruption
+                continue
+            if 'error' not in record:
+                done.add(record['source'])
+    return done
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scan en masse de photos de cartes Pokémon")
+    parser.add_argument('inputs', nargs='+', help='Images, dossiers ou archives ZIP')
+    parser.add_argument('-o', '--output', default='-', help='Fichier JSONL de sortie (- = stdout)')
+    parser.add_argument('--resume', action='store_true', help='Saute les images déjà présentes dans la sortie')
+    parser.add_argument('--lang', default='en')
+    parser.add_argument('--threshold', type=float, default=72)
+    parser.add_argument('--size-tolerance', type=float, default=0.3)
+    parser.add_argument('--grid', action='store_true', help='Mode classeur (analyse carte par carte)')
+    parser.add_argument('--max-side', type=int, default=None)
+    parser.add_argument('--grayscale', action='store_true')
+    parser.add_argument('--normalize-contrast', action='store_true')
+    parser.add_argument('--decode-workers', type=int, default=4)
+    parser.add_argument('--queue-size', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('SCANNER_WORKERS', '0') or 0),
+                        help='Processus de scan (défaut : SCANNER_WORKERS, 0 = processus courant)')
+    args = parser.parse_args(argv)
+
+    skip = load_checkpoint(args.output) if args.resume and args.output != '-' else set()
+    if skip:
+        print(f"⏭️ {len(skip)} image(s) déjà traitée(s), reprise", file=sys.stderr)
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'a', encoding='utf-8')
+    count, start = 0, time.perf_counter()
+    try:
+        records = scan_batch(
+            iter_sources(args.inputs), lang=args.lang, similarity_threshold=args.threshold,
+            size_tolerance=args.size_tolerance, grid_mode=args.grid,
+            decode_workers=args.decode_workers, queue_size=args.queue_size, skip=skip, workers=args.workers,
+            max_side=args.max_side, grayscale=args.grayscale, normalize_contrast=args.normalize_contrast,
+        )
+        for record in records:
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            out.flush()
+            count += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    if count:
+        print(f"✅ {count} image(s) en {elapsed:.1f} s ({count / elapsed:.2f} images/s)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+"""
+Benchmark des moteurs OCR : parité des sorties et latence sur les mêmes images
+
+Le premier moteur de --backends sert de référence. Pour chaque autre moteur
+et chaque image, les fragments OCR sont appariés à ceux de la référence
+(recouvrement des boîtes, IoU >= 0,5), puis on compare les textes, les
+confiances et les Pokémon finalement retrouvés par match_ocr_results.
+
+Usage :
+    python benchmarks/bench_backends.py
+    python benchmarks/bench_backends.py --backends torch,onnx-int8 --cpu --fail-on-mismatch --json backends.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from run_benchmarks import DEFAULT_FIXTURES, load_fixtures  # noqa: E402
+
+MIN_IOU = 0.5
+
+
+def extents(results):
+    """Boîtes englobantes (x_min, y_min, x_max, y_max) des fragments OCR"""
+    boxes = []
+    for bbox, _, _ in results:
+        xs, ys = [p[0] for p in bbox], [p[1] for p in bbox]
+        boxes.append((min(xs), min(ys), max(xs), max(ys)))
+    return boxes
+
+
+def iou(a, b):
+    w = min(a[2], b[2]) - max(a[0], b[0])
+    h = min(a[3], b[3]) - max(a[1], b[1])
+    if w <= 0 or h <= 0:
+        return 0.0
+    inter = w * h
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union else 0.0
+
+
+def pair_fragments(reference, candidate):
+    """Appariement glouton des fragments par IoU décroissant ; retourne les couples d'indices"""
+    ref_boxes, cand_boxes = extents(reference), extents(candidate)
+    scored = sorted(((iou(a, b), i, j) for i, a in enumerate(ref_boxes) for j, b in enumerate(cand_boxes)),
+                    reverse=True)
+    used_ref, used_cand, pairs = set(), set(), []
+    for overlap, i, j in scored:
+        if overlap < MIN_IOU:
+            break
+        if i not in used_ref and j not in used_cand:
+            used_ref.add(i)
+            used_cand.add(j)
+            pairs.append((i, j))
+    return pairs
+
+
+def scan_fixtures(fixtures, args):
+    """OCR + correspondance de chaque image avec le moteur courant ; latence médiane par image"""
+    import cv2
+    from pokemon_detector import run_ocr, match_ocr_results
+
+    scans = []
+    for fixture in fixtures:
+        image = cv2.imread(fixture['path'])
+        runs = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            results = run_ocr(image, fixture['lang'], max_side=args.max_side, use_cache=False)
+            runs.append((time.perf_counter() - start) * 1000)
+        found = match_ocr_results(results, fixture['lang'], args.threshold, args.size_tolerance) or []
+        scans.append({'results': results, 'names': sorted({r['name'] for r in found}),
+                      'latency_ms': statistics.median(runs)})
+    return scans
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--backends', default='torch,onnx,onnx-int8',
+                        help='Moteurs séparés par des virgules (le premier sert de référence)')
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURES, help="Fichier d'étiquettes")
+    parser.add_argument('--cpu', action='store_true', help='Référence PyTorch sur CPU (même matériel que ONNX)')
+    parser.add_argument('--threshold', type=float, default=72)
+    parser.add_argument('--size-tolerance', type=float, default=0.3)
+    parser.add_argument('--max-side', type=int, default=None)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--min-text-agreement', type=float, default=0.95,
+                        help='Part minimale de fragments appariés au même texte')
+    parser.add_argument('--fail-on-mismatch', action='store_true',
+                        help='Échec si un moteur trouve d\'autres Pokémon ou passe sous --min-text-agreement')
+    parser.add_argument('--json', help='Écrit le rapport dans ce fichier')
+    args = parser.parse_args()
+
+    if args.cpu:
+        # Avant l'import de torch
+        os.environ['CUDA_VISIBLE_DEVICES'] = ''
+
+    import ocr_reader
+
+    fixtures = load_fixtures(args.fixtures)
+    backends = args.backends.split(',')
+    langs = sorted({f['lang'] for f in fixtures})
+    scans, load_s = {}, {}
+    for backend in backends:
+        # Pool dédié : chaque moteur charge (ou exporte) ses propres modèles
+        ocr_reader._default_pool = ocr_reader.ReaderPool(backend=backend)
+        start = time.perf_counter()
+        ocr_reader._default_pool.warmup(langs)
+        load_s[backend] = time.perf_counter() - start
+        scans[backend] = scan_fixtures(fixtures, args)
+
+    reference = backends[0]
+    ref_latency = statistics.median(s['latency_ms'] for s in scans[reference])
+    report, failures = [], []
+    print(f"{len(fixtures)} images, référence : {reference}\n")
+    print(f"{'moteur':<12} {'chargement':>10} {'latence':>9} {'vitesse':>8} {'boîtes':>7} {'textes':>7} "
+          f"{'Δconf max':>9} {'Pokémon':>8}")
+    for backend in backends:
+        matched_boxes = total_boxes = same_text = paired = 0
+        conf_delta = 0.0
+        same_names = 0
+        images = []
+        for fixture, ref_scan, scan in zip(fixtures, scans[reference], scans[backend]):
+            pairs = pair_fragments(ref_scan['results'], scan['results'])
+            texts = sum(ref_scan['results'][i][1] == scan['results'][j][1] for i, j in pairs)
+            deltas = [abs(ref_scan['results'][i][2] - scan['results'][j][2]) for i, j in pairs]
+            matched_boxes += len(pairs)
+            total_boxes += max(len(ref_scan['results']), len(scan['results']))
+            same_text += texts
+            paired += len(pairs)
+            conf_delta = max([conf_delta] + deltas)
+            same_names += scan['names'] == ref_scan['names']
+            images.append({
+                'path': os.path.relpath(fixture['path'], ROOT),
+                'latency_ms': scan['latency_ms'],
+                'fragments': len(scan['results']),
+                'paired': len(pairs),
+                'same_text': texts,
+                'names': scan['names'],
+                'reference_names': ref_scan['names'],
+            })
+
+        latency = statistics.median(s['latency_ms'] for s in scans[backend])
+        summary = {
+            'backend': backend,
+            'load_s': load_s[backend],
+            'latency_ms_median': latency,
+            'speedup': ref_latency / latency if latency else 0.0,
+            'box_agreement': matched_boxes / total_boxes if total_boxes else 1.0,
+            'text_agreement': same_text / paired if paired else 1.0,
+            'max_confidence_delta': conf_delta,
+            'same_pokemon_images': same_names,
+        }
+        print(f"{backend:<12} {summary['load_s']:>9.1f}s {latency:>7.0f}ms {summary['speedup']:>7.2f}x "
+              f"{summary['box_agreement']:>7.1%} {summary['text_agreement']:>7.1%} {conf_delta:>9.3f} "
+              f"{same_names:>4}/{len(fixtures)}")
+        if same_names < len(fixtures):
+            failures.append(f"{backend} : Pokémon différents sur {len(fixtures) - same_names} image(s)")
+        if summary['text_agreement'] < args.min_text_agreement:
+            failures.append(f"{backend} : {summary['text_agreement']:.1%} de textes identiques")
+        report.append({'summary': summary, 'images': images})
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'reference': reference, 'settings': vars(args), 'results': report}, f, indent=2,
+                      ensure_ascii=False)
+
+    if failures:
+        print("\n⚠️ " + "\n⚠️ ".join(failures))
+        if args.fail_on_mismatch:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
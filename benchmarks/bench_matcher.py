@@ -0,0 +1,98 @@
+"""
+Micro-benchmark de la correspondance floue avec le Pokédex
+
+Compare le balayage linéaire historique (process.extractOne sur pokedexUS)
+au PokedexMatcher indexé et à sa version par lot (cdist), sur des fragments
+OCR synthétiques : noms bruités et textes de carte (attaques, PV, descriptions).
+
+Usage : python benchmarks/bench_matcher.py [--fragments 5000] [--threshold 72]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rapidfuzz import process, fuzz  # noqa: E402
+
+from pokedex import pokedexUS  # noqa: E402
+from pokedex_matcher import default_matcher  # noqa: E402
+
+CARD_WORDS = [
+    'Evolves', 'from', 'Put', 'on', 'the', 'Basic', 'Pokemon', 'STAGE', 'HP', 'Length',
+    'Weight', 'lbs', 'weakness', 'resistance', 'retreat', 'cost', 'Dragon', 'Rage',
+    'Bubblebeam', 'Flip', 'a', 'coin', 'If', 'heads', 'Defending', 'is', 'now', 'Paralyzed',
+    'Water', 'Gun', 'Does', 'damage', 'plus', 'more', 'for', 'each', 'Energy', 'attached',
+    'Whirlpool', 'Wing', 'Attack', 'Metronome', 'Solarbeam', 'Psypunch', 'TRAINER', 'Illus',
+]
+
+
+def make_fragments(count, seed=0):
+    """Génère des fragments : ~1/3 de noms avec fautes OCR, ~2/3 de textes de carte"""
+    rng = random.Random(seed)
+    fragments = []
+    for _ in range(count):
+        if rng.random() < 1 / 3:
+            name = list(''.join(c for c in rng.choice(pokedexUS) if c.isalpha()))
+            for _ in range(rng.randint(0, 2)):
+                name[rng.randrange(len(name))] = rng.choice('abcdefghijklmnopqrstuvwxyz')
+            fragments.append(''.join(name))
+        else:
+            fragments.append(rng.choice(CARD_WORDS))
+    return fragments
+
+
+def legacy_match(fragment):
+    return process.extractOne(fragment, pokedexUS, scorer=fuzz.ratio)
+
+
+def bench(fn, fragments, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for fragment in fragments:
+            fn(fragment)
+        best = min(best, time.perf_counter() - start)
+    return len(fragments) / best
+
+
+def bench_batch(fragments, threshold, repeat):
+    """Tous les fragments en un seul appel cdist, comme detect_pokemon_name"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        default_matcher.match_many(fragments, 'en', score_cutoff=threshold)
+        best = min(best, time.perf_counter() - start)
+    return len(fragments) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--fragments', type=int, default=5000)
+    parser.add_argument('--threshold', type=float, default=72)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    fragments = make_fragments(args.fragments)
+    results = {
+        'balayage linéaire (extractOne)': bench(legacy_match, fragments, args.repeat),
+        'PokedexMatcher (sans seuil)': bench(
+            lambda f: default_matcher.match(f, 'en'), fragments, args.repeat),
+        f'PokedexMatcher (seuil {args.threshold:g})': bench(
+            lambda f: default_matcher.match(f, 'en', score_cutoff=args.threshold), fragments, args.repeat),
+        f'PokedexMatcher 5 langues (seuil {args.threshold:g})': bench(
+            lambda f: default_matcher.match(f, 'all', score_cutoff=args.threshold), fragments, args.repeat),
+        f'PokedexMatcher.match_many / cdist (seuil {args.threshold:g})': bench_batch(
+            fragments, args.threshold, args.repeat),
+    }
+
+    baseline = next(iter(results.values()))
+    print(f"{len(fragments)} fragments, meilleur de {args.repeat} essais\n")
+    for label, rate in results.items():
+        print(f"{label:<45} {rate:>12,.0f} fragments/s  (x{rate / baseline:.2f})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark du prétraitement : latence et taux de reconnaissance par résolution
+
+Pour chaque valeur de max_side, mesure le temps OCR + correspondance de
+detect_pokemon_name et la part des noms attendus retrouvés. Sans fichier
+d'étiquettes, la référence est le résultat à la résolution d'origine.
+
+Usage :
+    python benchmarks/bench_preprocess.py --scales 0,1600,1280,960,720
+    python benchmarks/bench_preprocess.py photos/ --labels labels.json --grayscale --json report.json
+
+Sans image en argument, le jeu étiqueté benchmarks/fixtures/labels.json est utilisé.
+Un fichier d'étiquettes peut aussi associer un nom de fichier aux Pokémon attendus :
+    {"test_pokemon.png": ["Gyarados", "Poliwrath", ...]}
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2  # noqa: E402
+
+from pokemon_detector import run_ocr, match_ocr_results  # noqa: E402
+from ocr_reader import get_reader_pool  # noqa: E402
+from run_benchmarks import DEFAULT_FIXTURES, load_fixtures  # noqa: E402
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.bmp')
+
+
+def list_images(paths):
+    images = []
+    for path in paths:
+        if os.path.isdir(path):
+            images.extend(os.path.join(path, f) for f in sorted(os.listdir(path))
+                          if f.lower().endswith(IMAGE_EXTENSIONS))
+        else:
+            images.append(path)
+    return images
+
+
+def scan(image, lang, max_side, args):
+    start = time.perf_counter()
+    results = run_ocr(image, lang, use_cache=False, max_side=max_side or None, grayscale=args.grayscale,
+                      normalize_contrast=args.normalize_contrast,
+                      canvas_size=args.canvas_size, mag_ratio=args.mag_ratio)
+    found = match_ocr_results(results, lang, args.threshold, args.size_tolerance) or []
+    return time.perf_counter() - start, {r['name'] for r in found}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('images', nargs='*', help='Images ou dossiers (défaut : jeu étiqueté)')
+    parser.add_argument('--labels', help='JSON {fichier: [noms attendus]}')
+    parser.add_argument('--scales', default='0,1600,1280,960,720',
+                        help='Valeurs de max_side séparées par des virgules (0 = originale)')
+    parser.add_argument('--lang', default='en')
+    parser.add_argument('--threshold', type=float, default=72)
+    parser.add_argument('--size-tolerance', type=float, default=0.3)
+    parser.add_argument('--grayscale', action='store_true')
+    parser.add_argument('--normalize-contrast', action='store_true')
+    parser.add_argument('--canvas-size', type=int, default=2560)
+    parser.add_argument('--mag-ratio', type=float, default=1.0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--json', help='Écrit le rapport dans ce fichier')
+    args = parser.parse_args()
+
+    labels = {}
+    if not args.images:
+        fixtures = load_fixtures(args.labels or DEFAULT_FIXTURES)
+        paths = [f['path'] for f in fixtures]
+        labels = {os.path.basename(f['path']): set(f['expected']) for f in fixtures}
+    else:
+        paths = list_images(args.images)
+        if args.labels:
+            with open(args.labels, encoding='utf-8') as f:
+                data = json.load(f)
+            if 'images' in data:
+                labels = {os.path.basename(f['path']): set(f['expected']) for f in load_fixtures(args.labels)}
+            else:
+                labels = {os.path.basename(k): set(v) for k, v in data.items()}
+    images = {path: cv2.imread(path) for path in paths}
+    scales = [int(s) for s in args.scales.split(',')]
+
+    # Chargement du Reader hors mesure
+    get_reader_pool().warmup([args.lang])
+
+    reference = {}
+    if not labels:
+        for path, image in images.items():
+            reference[path] = scan(image, args.lang, 0, args)[1]
+
+    report = []
+    print(f"{'max_side':>9} {'latence méd. (ms)':>18} {'p95 (ms)':>9} {'taux de match':>14}")
+    for max_side in scales:
+        latencies, found_total, expected_total = [], 0, 0
+        for path, image in images.items():
+            expected = labels.get(os.path.basename(path), reference.get(path, set()))
+            for _ in range(args.repeat):
+                elapsed, found = scan(image, args.lang, max_side, args)
+                latencies.append(elapsed * 1000)
+            found_total += len(expected & found)
+            expected_total += len(expected)
+        latencies.sort()
+        row = {
+            'max_side': max_side or None,
+            'latency_ms_median': statistics.median(latencies),
+            'latency_ms_p95': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+            'match_rate': found_total / expected_total if expected_total else None,
+        }
+        report.append(row)
+        rate = f"{row['match_rate'] * 100:.1f}%" if row['match_rate'] is not None else 'n/a'
+        print(f"{max_side or 'orig.':>9} {row['latency_ms_median']:>18.0f} {row['latency_ms_p95']:>9.0f} {rate:>14}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'images': paths, 'settings': vars(args), 'results': report}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark du démarrage : temps d'import des modules du scanner
+
+Chaque module est importé dans un interpréteur neuf avec `python -X importtime`
+(plusieurs fois, médiane retenue). Le rapport donne le temps total, les
+dépendances les plus coûteuses et vérifie que les modules lourds (torch,
+easyocr, gradio) ne sont pas chargés à l'import : ils doivent l'être au
+premier usage ou par le préchargement en arrière-plan (voir warm_start).
+
+Usage :
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --modules app --max-ms 1000 --json startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = ('pokedex_matcher', 'pokemon_detector', 'app', 'batch_scan', 'worker_pool')
+HEAVY_MODULES = ('torch', 'easyocr', 'gradio')
+
+
+def import_profile(module):
+    """
+    Importe `module` dans un nouvel interpréteur avec -X importtime
+
+    Returns:
+        Dict {module importé: (temps propre, temps cumulé)} en ms, et le temps total en ms
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Import de {module} impossible :\n{result.stderr[-2000:]}")
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        profile[name.strip()] = (int(self_us) / 1000, int(cumulative_us) / 1000)
+    return profile, profile[module][1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--modules', default=','.join(DEFAULT_MODULES), help='Modules séparés par des virgules')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--top', type=int, default=8, help='Dépendances les plus coûteuses affichées')
+    parser.add_argument('--max-ms', type=float, help="Échec si un import dépasse cette durée")
+    parser.add_argument('--json', help='Écrit le rapport dans ce fichier')
+    args = parser.parse_args()
+
+    report, failures = [], []
+    for module in args.modules.split(','):
+        runs = [import_profile(module) for _ in range(args.repeat)]
+        total_ms = statistics.median(total for _, total in runs)
+        profile = runs[-1][0]
+        heavy = [name for name in HEAVY_MODULES if name in profile]
+        # Dépendances triées par temps cumulé (hors le module lui-même)
+        top = sorted(((cumulative, name) for name, (_, cumulative) in profile.items() if name != module),
+                     reverse=True)[:args.top]
+
+        print(f"\n{module} : {total_ms:.0f} ms ({len(profile)} modules importés)")
+        for cumulative, name in top:
+            print(f"  {cumulative:>8.1f} ms  {name}")
+        if heavy:
+            print(f"  ⚠️ modules lourds importés : {', '.join(heavy)}")
+            failures.append(f"{module} importe {', '.join(heavy)}")
+        if args.max_ms and total_ms > args.max_ms:
+            failures.append(f"{module} : {total_ms:.0f} ms > {args.max_ms:.0f} ms")
+
+        report.append({
+            'module': module,
+            'import_ms': total_ms,
+            'modules_imported': len(profile),
+            'heavy_modules': heavy,
+            'top': [{'module': name, 'cumulative_ms': cumulative} for cumulative, name in top],
+        })
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'python': sys.version.split()[0], 'results': report}, f, indent=2)
+
+    if failures:
+        print("\n❌ " + "\n❌ ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+"""
+Suite de benchmarks de bout en bout sur le jeu d'images étiquetées
+
+Mesure, sans cache OCR et après chargement du Reader :
+  - la latence par image (médiane, p95) et le débit en images/s
+  - le pic de mémoire résidente (RSS) du processus
+  - la précision et le rappel de detect_pokemon_name (ou du mode classeur)
+
+Le rapport JSON peut être comparé à celui d'un autre commit avec --compare.
+
+Usage :
+    python benchmarks/run_benchmarks.py -o report.json
+    python benchmarks/run_benchmarks.py --grid --compare report.json --fail-on-regression
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_FIXTURES = os.path.join(ROOT, 'benchmarks', 'fixtures', 'labels.json')
+
+# Écarts tolérés avant de signaler une régression avec --compare
+LATENCY_TOLERANCE = 0.10
+ACCURACY_TOLERANCE = 0.01
+
+
+def load_fixtures(path=DEFAULT_FIXTURES):
+    """
+    Charge le jeu d'images étiquetées
+
+    Returns:
+        Liste de dicts (path absolu, kind, lang, expected)
+    """
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    fixtures = []
+    for entry in data['images']:
+        fixtures.append({
+            'path': os.path.normpath(os.path.join(base, entry['path'])),
+            'kind': entry.get('kind', 'single_card'),
+            'lang': entry.get('lang', 'en'),
+            'expected': list(entry.get('expected', [])),
+        })
+    return fixtures
+
+
+def peak_rss_mb():
+    """Pic de mémoire résidente du processus (ru_maxrss : Ko sous Linux, octets sous macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def score(expected, found):
+    """Vrais positifs, faux positifs et faux négatifs sur les noms distincts"""
+    expected, found = set(expected), set(found)
+    return len(expected & found), len(found - expected), len(expected - found)
+
+
+def run(fixtures, args):
+    from pokemon_detector import detect_pokemon_name, detect_pokemon_grid
+    from ocr_reader import get_reader_pool
+
+    # Le chargement des modèles est mesuré à part
+    start = time.perf_counter()
+    get_reader_pool().warmup(sorted({f['lang'] for f in fixtures}))
+    reader_load_s = time.perf_counter() - start
+
+    ocr_options = {'use_cache': False}
+    if args.max_side:
+        ocr_options['max_side'] = args.max_side
+
+    images, latencies = [], []
+    tp = fp = fn = 0
+    wall_start = time.perf_counter()
+    for fixture in fixtures:
+        runs = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            if args.grid:
+                results = detect_pokemon_grid(fixture['path'], fixture['lang'], args.threshold, **ocr_options)
+            else:
+                results = detect_pokemon_name(fixture['path'], fixture['lang'], args.threshold,
+                                              args.size_tolerance, **ocr_options)
+            runs.append((time.perf_counter() - start) * 1000)
+        latencies.extend(runs)
+        found = sorted({r['name'] for r in results or []})
+        t, p, n = score(fixture['expected'], found)
+        tp, fp, fn = tp + t, fp + p, fn + n
+        images.append({
+            'path': os.path.relpath(fixture['path'], ROOT),
+            'kind': fixture['kind'],
+            'expected': fixture['expected'],
+            'found': found,
+            'latency_ms': statistics.median(runs),
+        })
+    wall_s = time.perf_counter() - wall_start
+
+    latencies.sort()
+    summary = {
+        'images': len(fixtures),
+        'latency_ms_median': statistics.median(latencies),
+        'latency_ms_p95': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        'throughput_images_per_s': len(fixtures) * args.repeat / wall_s,
+        'precision': tp / (tp + fp) if tp + fp else 1.0,
+        'recall': tp / (tp + fn) if tp + fn else 1.0,
+        'peak_rss_mb': peak_rss_mb(),
+        'reader_load_s': reader_load_s,
+    }
+    return summary, images
+
+
+def compare(summary, previous):
+    """Affiche les écarts avec un rapport précédent ; retourne la liste des régressions"""
+    old = previous['summary']
+    regressions = []
+    print(f"\nComparaison avec {previous.get('commit') or 'le rapport précédent'} :")
+    for key in ('latency_ms_median', 'latency_ms_p95', 'throughput_images_per_s',
+                'precision', 'recall', 'peak_rss_mb'):
+        before, after = old.get(key), summary[key]
+        if before is None:
+            continue
+        delta = (after - before) / before if before else 0.0
+        print(f"  {key:<26} {before:>10.3f} → {after:>10.3f}  ({delta:+.1%})")
+        if key.startswith('latency') and delta > LATENCY_TOLERANCE:
+            regressions.append(key)
+        elif key == 'throughput_images_per_s' and delta < -LATENCY_TOLERANCE:
+            regressions.append(key)
+        elif key in ('precision', 'recall') and after < before - ACCURACY_TOLERANCE:
+            regressions.append(key)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURES, help="Fichier d'étiquettes")
+    parser.add_argument('--kind', choices=['binder_page', 'single_card'], help='Ne garder que ce type')
+    parser.add_argument('--grid', action='store_true', help='Mesurer le mode classeur (detect_pokemon_grid)')
+    parser.add_argument('--threshold', type=float, default=72)
+    parser.add_argument('--size-tolerance', type=float, default=0.3)
+    parser.add_argument('--max-side', type=int, default=None)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('-o', '--output', help='Écrit le rapport JSON dans ce fichier')
+    parser.add_argument('--compare', help='Rapport JSON précédent à comparer')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args()
+
+    fixtures = [f for f in load_fixtures(args.fixtures) if not args.kind or f['kind'] == args.kind]
+    summary, images = run(fixtures, args)
+
+    print(f"{summary['images']} images, {args.repeat} passage(s) chacune")
+    print(f"  latence médiane   {summary['latency_ms_median']:.0f} ms (p95 {summary['latency_ms_p95']:.0f} ms)")
+    print(f"  débit             {summary['throughput_images_per_s']:.2f} images/s")
+    print(f"  précision         {summary['precision']:.1%}")
+    print(f"  rappel            {summary['recall']:.1%}")
+    print(f"  pic RSS           {summary['peak_rss_mb']:.0f} Mo")
+    print(f"  chargement Reader {summary['reader_load_s']:.1f} s")
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'settings': {k: v for k, v in vars(args).items() if k not in ('output', 'compare', 'fail_on_regression')},
+        'summary': summary,
+        'images': images,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(summary, json.load(f))
+        if regressions:
+            print(f"\n⚠️ Régressions : {', '.join(regressions)}")
+            if args.fail_on_regression:
+                sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
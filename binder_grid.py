@@ -0,0 +1,158 @@
+import cv2
+import numpy as np
+
+# Dispositions de classeur supportées : (lignes, colonnes)
+BINDER_LAYOUTS = [(3, 3), (4, 3), (2, 2)]
+
+# Rapport largeur / hauteur d'une carte Pokémon (63 x 88 mm)
+CARD_ASPECT = 63 / 88
+
+# Écart relatif toléré sur ce rapport (perspective, marges de la photo)
+CARD_ASPECT_TOLERANCE = 0.25
+
+# Bandeau du nom, en fraction de la carte : (gauche, haut, droite, bas)
+NAME_BAND = (0.04, 0.02, 0.96, 0.14)
+
+
+def find_card_boxes(image, max_side=800):
+    """
+    Cherche les rectangles de cartes par détection de contours
+
+    Args:
+        image: Image BGR ou niveaux de gris
+        max_side: La détection se fait sur une copie réduite à cette taille
+
+    Returns:
+        Liste de boîtes (x, y, w, h) en coordonnées de l'image d'origine
+    """
+    h, w = image.shape[:2]
+    scale = min(1.0, max_side / max(h, w))
+    small = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1 else image
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+    gray = cv2.GaussianBlur(gray, (5, 5), 0)
+
+    # Bords des cartes : contours fermés par une dilatation
+    edges = cv2.Canny(gray, 30, 100)
+    edges = cv2.dilate(edges, np.ones((3, 3), np.uint8), iterations=2)
+    contours, _ = cv2.findContours(edges, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+
+    small_area = small.shape[0] * small.shape[1]
+    boxes = []
+    for contour in contours:
+        x, y, bw, bh = cv2.boundingRect(contour)
+        area_ratio = bw * bh / small_area
+        aspect = bw / bh
+        # Une carte occupe entre 1/25 et 1/4 de la page, avec le bon rapport
+        if 0.04 <= area_ratio <= 0.25 and abs(aspect - CARD_ASPECT) / CARD_ASPECT < CARD_ASPECT_TOLERANCE:
+            boxes.append((x / scale, y / scale, bw / scale, bh / scale))
+    return boxes
+
+
+def estimate_layout(boxes, image_shape, layouts=BINDER_LAYOUTS):
+    """
+    Choisit la disposition (lignes, colonnes) la plus compatible avec la page
+
+    Avec des cartes détectées, on compare leur taille médiane à celle des
+    cases de chaque disposition ; sinon on se fie au rapport de la page.
+    """
+    h, w = image_shape[:2]
+    if boxes:
+        card_w = np.median([b[2] for b in boxes])
+        card_h = np.median([b[3] for b in boxes])
+        est_cols, est_rows = w / card_w, h / card_h
+        return min(layouts, key=lambda l: abs(l[0] - est_rows) + abs(l[1] - est_cols))
+    page_aspect = w / h
+    return min(layouts, key=lambda l: abs(page_aspect * l[0] / l[1] - CARD_ASPECT))
+
+
+def segment_binder_page(image, layout=None, layouts=BINDER_LAYOUTS, boxes=None):
+    """
+    Découpe une page de classeur en cases (une carte par case)
+
+    Les cartes trouvées par contours sont rangées dans la grille ; les cases
+    vides sont complétées à partir des cartes de la même ligne / colonne.
+
+    Args:
+        image: Image BGR de la page
+        layout: (lignes, colonnes) imposé, sinon estimé parmi `layouts`
+        boxes: Résultat de find_card_boxes s'il est déjà calculé
+
+    Returns:
+        Liste de dicts {'row', 'col', 'box': (x, y, w, h), 'detected': bool},
+        triée par ligne puis colonne
+    """
+    h, w = image.shape[:2]
+    if boxes is None:
+        boxes = find_card_boxes(image)
+    rows, cols = layout or estimate_layout(boxes, image.shape, layouts)
+    cell_w, cell_h = w / cols, h / rows
+
+    # Une boîte par case : la plus grande (le bord extérieur de la carte)
+    cells = {}
+    for box in boxes:
+        x, y, bw, bh = box
+        col = min(cols - 1, int((x + bw / 2) / cell_w))
+        row = min(rows - 1, int((y + bh / 2) / cell_h))
+        if (row, col) not in cells or bw * bh > cells[(row, col)][2] * cells[(row, col)][3]:
+            cells[(row, col)] = box
+
+    if cells:
+        card_w = float(np.median([b[2] for b in cells.values()]))
+        card_h = float(np.median([b[3] for b in cells.values()]))
+    else:
+        card_w, card_h = cell_w * 0.9, cell_h * 0.9
+
+    grid = []
+    for row in range(rows):
+        for col in range(cols):
+            box = cells.get((row, col))
+            detected = box is not None
+            if not detected:
+                # Position déduite des voisines de la même colonne / ligne
+                same_col = [b[0] for (r, c), b in cells.items() if c == col]
+                same_row = [b[1] for (r, c), b in cells.items() if r == row]
+                x = float(np.median(same_col)) if same_col else col * cell_w + (cell_w - card_w) / 2
+                y = float(np.median(same_row)) if same_row else row * cell_h + (cell_h - card_h) / 2
+                box = (x, y, card_w, card_h)
+            grid.append({'row': row, 'col': col, 'box': _clip_box(box, w, h), 'detected': detected})
+    return grid
+
+
+def find_card_cells(image, min_cards=2):
+    """
+    Cases des cartes d'une photo, page de classeur ou carte seule
+
+    Returns:
+        Cases de segment_binder_page si au moins `min_cards` cartes sont
+        détectées ; sinon une seule case couvrant toute l'image si elle a le
+        format d'une carte, et aucune case pour une page dont les cartes n'ont
+        pas été trouvées (deux cartes distinctes ne doivent pas partager une case)
+    """
+    boxes = find_card_boxes(image)
+    if len(boxes) >= min_cards:
+        return segment_binder_page(image, boxes=boxes)
+    h, w = image.shape[:2]
+    if abs(w / h - CARD_ASPECT) / CARD_ASPECT < CARD_ASPECT_TOLERANCE:
+        return [{'row': 0, 'col': 0, 'box': (0, 0, w, h), 'detected': False}]
+    return []
+
+
+def _clip_box(box, w, h):
+    x, y, bw, bh = box
+    x0, y0 = max(0, int(round(x))), max(0, int(round(y)))
+    x1, y1 = min(w, int(round(x + bw))), min(h, int(round(y + bh)))
+    return x0, y0, max(0, x1 - x0), max(0, y1 - y0)
+
+
+def name_band(image, box, band=NAME_BAND):
+    """
+    Découpe le bandeau du nom (haut de la carte)
+
+    Returns:
+        Tuple (crop, (x_offset, y_offset)) ; le crop est une vue sur `image`
+    """
+    x, y, bw, bh = box
+    left, top, right, bottom = band
+    x0, x1 = x + int(bw * left), x + int(bw * right)
+    y0, y1 = y + int(bh * top), y + int(bh * bottom)
+    return image[y0:y1, x0:x1], (x0, y0)
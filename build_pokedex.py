@@ -0,0 +1,29 @@
+"""
+Génère pokedex.json, l'artefact compact chargé au démarrage par pokedex_matcher
+
+À relancer après toute modification de pokedex.py (sinon l'artefact, dont
+l'empreinte ne correspond plus, est ignoré et le module est relu).
+
+Usage :
+    python build_pokedex.py
+"""
+import json
+
+import pokedex
+from pokedex_matcher import POKEDEX_ARTIFACT, POKEDEX_BY_LANG, pokedex_source_digest
+
+
+def build(path=POKEDEX_ARTIFACT):
+    artifact = {
+        'source': pokedex_source_digest(),
+        'pokedex': {lang: getattr(pokedex, attr) for lang, attr in POKEDEX_BY_LANG.items()},
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(artifact, f, ensure_ascii=False, separators=(',', ':'))
+    return artifact
+
+
+if __name__ == '__main__':
+    artifact = build()
+    counts = ', '.join(f"{lang}: {len(names)}" for lang, names in artifact['pokedex'].items())
+    print(f"✅ {POKEDEX_ARTIFACT} ({counts})")
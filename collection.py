@@ -0,0 +1,320 @@
+"""
+Inventaire d'une collection : Pokémon dédoublonnés et agrégés sur tous les scans
+
+Le même nom peut être lu deux fois sur une carte (le nom et la ligne
+d'évolution qui le cite, deux fragments qui se chevauchent). Chaque photo est
+donc dédoublonnée avant d'entrer dans l'index : une détection est un doublon
+d'une autre du même nom si leurs zones se recouvrent ou si elles tombent dans
+la même case du classeur.
+
+L'index est une base SQLite : une ligne par carte, rattachée à sa photo. Les
+photos déjà indexées dont le fichier n'a pas changé (taille et date, ou CRC
+dans une archive) ne sont pas rescannées. Ajouter une page ne touche donc que
+ses propres lignes, et l'inventaire par espèce est calculé par SQLite.
+
+Usage :
+    python collection.py scan photos/ collection.zip -d collection.db
+    python collection.py list -d collection.db
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import zipfile
+
+from batch_scan import iter_sources, scan_batch
+
+# Part de la plus petite zone couverte par l'autre pour deux détections du même nom
+MIN_OVERLAP = 0.5
+
+
+def _overlap(a, b):
+    """Intersection de deux boîtes (x, y, w, h), rapportée à la plus petite"""
+    w = min(a[0] + a[2], b[0] + b[2]) - max(a[0], b[0])
+    h = min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1])
+    smallest = min(a[2] * a[3], b[2] * b[3])
+    if w <= 0 or h <= 0 or smallest <= 0:
+        return 0.0
+    return w * h / smallest
+
+
+def _cell_of(detection, cards):
+    """Case (ligne, colonne) d'une détection : celle du mode classeur, sinon celle qui contient son centre"""
+    if 'row' in detection:
+        return detection['row'], detection['col']
+    if not cards or not detection.get('bbox'):
+        return None
+    x, y, w, h = detection['bbox']
+    cx, cy = x + w / 2, y + h / 2
+    for card in cards:
+        bx, by, bw, bh = card['box']
+        if bx <= cx < bx + bw and by <= cy < by + bh:
+            return card['row'], card['col']
+    return None
+
+
+def dedupe_detections(detections, cards=None, min_overlap=MIN_OVERLAP):
+    """
+    Supprime les détections en double d'une même photo
+
+    Deux détections du même nom sont un doublon si leurs bbox se recouvrent
+    (au moins `min_overlap` de la plus petite) ou si elles sont dans la même
+    case. Seule la plus confiante est gardée.
+
+    Args:
+        detections: Résultats de detect_pokemon_name ou detect_pokemon_grid
+        cards: Cases des cartes de la photo (voir binder_grid.find_card_cells)
+
+    Returns:
+        Détections gardées, dans leur ordre d'origine, chacune avec sa case
+        (row, col) si elle est connue
+    """
+    order = sorted(range(len(detections)), key=lambda i: -detections[i]['confidence'])
+    kept = []
+    for index in order:
+        detection = detections[index]
+        cell = _cell_of(detection, cards)
+        duplicate = False
+        for _, other, other_cell in kept:
+            if other['name'] != detection['name']:
+                continue
+            if cell is not None and cell == other_cell:
+                duplicate = True
+            elif detection.get('bbox') and other.get('bbox'):
+                duplicate = _overlap(detection['bbox'], other['bbox']) >= min_overlap
+            if duplicate:
+                break
+        if not duplicate:
+            kept.append((index, detection, cell))
+
+    deduped = []
+    for _, detection, cell in sorted(kept, key=lambda k: k[0]):
+        if cell is not None and 'row' not in detection:
+            detection = dict(detection, row=cell[0], col=cell[1])
+        deduped.append(detection)
+    return deduped
+
+
+def source_signatures(source_ids):
+    """
+    Signature du contenu de chaque source, pour savoir si elle a changé depuis son scan
+
+    Fichier : taille et date de modification ; image d'archive
+    ("archive.zip:chemin/interne.png") : CRC et taille du membre. None si la
+    source n'est pas un fichier (elle est alors toujours rescannée).
+    """
+    archives = {}
+    signatures = {}
+    try:
+        for source_id in source_ids:
+            signature = None
+            if isinstance(source_id, str) and os.path.isfile(source_id):
+                stat = os.stat(source_id)
+                signature = f"{stat.st_size}:{stat.st_mtime_ns}"
+            elif isinstance(source_id, str) and '.zip:' in source_id.lower():
+                split = source_id.lower().index('.zip:') + len('.zip')
+                archive_path, member = source_id[:split], source_id[split + 1:]
+                if archive_path not in archives:
+                    archives[archive_path] = zipfile.ZipFile(archive_path) if zipfile.is_zipfile(archive_path) else None
+                archive = archives[archive_path]
+                if archive is not None:
+                    try:
+                        info = archive.getinfo(member)
+                        signature = f"zip:{info.CRC}:{info.file_size}"
+                    except KeyError:
+                        pass
+            signatures[source_id] = signature
+    finally:
+        for archive in archives.values():
+            if archive is not None:
+                archive.close()
+    return signatures
+
+
+class Collection:
+    """
+    Index incrémental des cartes scannées (SQLite)
+
+    Args:
+        path: Fichier SQLite (':memory:' = index en mémoire seulement)
+        min_overlap: Voir dedupe_detections
+    """
+
+    def __init__(self, path=':memory:', min_overlap=MIN_OVERLAP):
+        self.path = path
+        self.min_overlap = min_overlap
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS pages (
+                source TEXT PRIMARY KEY, signature TEXT, scanned REAL, count INTEGER, error TEXT);
+            CREATE TABLE IF NOT EXISTS cards (
+                source TEXT, name TEXT, similarity REAL, confidence REAL, lang TEXT,
+                row INTEGER, col INTEGER, bbox TEXT);
+            CREATE INDEX IF NOT EXISTS cards_source ON cards (source);
+            CREATE INDEX IF NOT EXISTS cards_name ON cards (name);
+        """)
+        self._db.commit()
+
+    def add(self, source, detections, cards=None, signature=None, error=None):
+        """
+        Indexe (ou réindexe) les détections d'une photo
+
+        Les cartes déjà indexées pour cette source sont remplacées ; les autres
+        pages ne sont pas touchées. Une page en erreur est gardée sans
+        signature, pour être rescannée la fois suivante.
+
+        Returns:
+            Détections gardées après dédoublonnage
+        """
+        deduped = dedupe_detections(detections or [], cards, self.min_overlap)
+        rows = [
+            (str(source), d['name'], d['similarity'], d['confidence'], d.get('lang'), d.get('row'), d.get('col'),
+             json.dumps(d['bbox']) if d.get('bbox') else None)
+            for d in deduped
+        ]
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM cards WHERE source = ?", (str(source),))
+            self._db.executemany("INSERT INTO cards VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._db.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)",
+                             (str(source), None if error else signature, time.time(), len(rows), error))
+        return deduped
+
+    def remove(self, source):
+        """Retire une photo et ses cartes de l'index"""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM cards WHERE source = ?", (str(source),))
+            self._db.execute("DELETE FROM pages WHERE source = ?", (str(source),))
+
+    def signatures(self):
+        """Dict {source: signature} des photos indexées sans erreur"""
+        with self._lock:
+            return dict(self._db.execute("SELECT source, signature FROM pages WHERE error IS NULL"))
+
+    def species(self):
+        """
+        Inventaire par espèce
+
+        Returns:
+            Liste de dicts (name, count, pages, best_confidence, similarity, lang,
+            source, row, col, bbox), triée par nombre d'exemplaires ; source et
+            position sont celles de l'exemplaire le mieux lu
+        """
+        with self._lock:
+            rows = self._db.execute("""
+                SELECT totals.name, count, pages, confidence, similarity, lang, source, row, col, bbox
+                FROM (SELECT name, COUNT(*) AS count, COUNT(DISTINCT source) AS pages
+                      FROM cards GROUP BY name) AS totals
+                JOIN (SELECT *, ROW_NUMBER() OVER (PARTITION BY name ORDER BY confidence DESC) AS rank
+                      FROM cards) AS best ON best.name = totals.name AND rank = 1
+                ORDER BY count DESC, totals.name
+            """).fetchall()
+        keys = ('name', 'count', 'pages', 'best_confidence', 'similarity', 'lang', 'source', 'row', 'col', 'bbox')
+        inventory = []
+        for row in rows:
+            entry = dict(zip(keys, row))
+            entry['bbox'] = json.loads(entry['bbox']) if entry['bbox'] else None
+            inventory.append(entry)
+        return inventory
+
+    def stats(self):
+        """Nombre de photos indexées (dont en erreur), de cartes et d'espèces"""
+        with self._lock:
+            pages, errors = self._db.execute("SELECT COUNT(*), COUNT(error) FROM pages").fetchone()
+            cards, species = self._db.execute("SELECT COUNT(*), COUNT(DISTINCT name) FROM cards").fetchone()
+        return {'pages': pages, 'errors': errors, 'cards': cards, 'species': species}
+
+    def close(self):
+        self._db.close()
+
+
+def update_collection(collection, paths, rescan=False, grid_mode=False, **scan_options):
+    """
+    Scanne les photos nouvelles ou modifiées et les ajoute à la collection
+
+    Args:
+        collection: Collection à mettre à jour
+        paths: Images, dossiers ou archives ZIP (voir batch_scan.iter_sources)
+        rescan: Si True, rescanne aussi les photos déjà indexées
+        grid_mode: Voir scan_batch ; sinon les cases des cartes sont cherchées
+            pour dédoublonner par carte
+        **scan_options: Voir batch_scan.scan_batch
+
+    Yields:
+        Un dict par photo scannée : source, pokemon (dédoublonnés), count,
+        timings et error le cas échéant
+    """
+    sources = list(iter_sources(paths))
+    signatures = source_signatures([source_id for source_id, _ in sources])
+    indexed = {} if rescan else collection.signatures()
+    skip = {source_id for source_id, _ in sources
+            if signatures[source_id] is not None and indexed.get(source_id) == signatures[source_id]}
+
+    for record in scan_batch(sources, grid_mode=grid_mode, skip=skip, find_cards=not grid_mode, **scan_options):
+        record['pokemon'] = collection.add(record['source'], record['pokemon'], record.pop('cards', None),
+                                           signatures.get(record['source']), record.get('error'))
+        record['count'] = len(record['pokemon'])
+        yield record
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inventaire d'une collection de cartes Pokémon")
+    parser.add_argument('-d', '--database', default='collection.db', help='Index SQLite de la collection')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    scan = commands.add_parser('scan', help='Ajoute les photos nouvelles ou modifiées')
+    scan.add_argument('inputs', nargs='+', help='Images, dossiers ou archives ZIP')
+    scan.add_argument('--rescan', action='store_true', help='Rescanne aussi les photos déjà indexées')
+    scan.add_argument('--lang', default='en')
+    scan.add_argument('--threshold', type=float, default=72)
+    scan.add_argument('--size-tolerance', type=float, default=0.3)
+    scan.add_argument('--grid', action='store_true', help='Mode classeur (analyse carte par carte)')
+    scan.add_argument('--max-side', type=int, default=None)
+    scan.add_argument('--workers', type=int, default=int(os.environ.get('SCANNER_WORKERS', '0') or 0),
+                      help='Processus de scan (défaut : SCANNER_WORKERS, 0 = processus courant)')
+
+    listing = commands.add_parser('list', help='Affiche l\'inventaire par espèce')
+    listing.add_argument('--json', action='store_true', help='Inventaire au format JSON')
+
+    remove = commands.add_parser('remove', help='Retire des photos de l\'index')
+    remove.add_argument('sources', nargs='+')
+    args = parser.parse_args(argv)
+
+    collection = Collection(args.database)
+    try:
+        if args.command == 'scan':
+            count, start = 0, time.perf_counter()
+            for record in update_collection(
+                collection, args.inputs, rescan=args.rescan, grid_mode=args.grid, lang=args.lang,
+                similarity_threshold=args.threshold, size_tolerance=args.size_tolerance, workers=args.workers,
+                max_side=args.max_side,
+            ):
+                count += 1
+                status = record.get('error') or ', '.join(p['name'] for p in record['pokemon']) or '-'
+                print(f"{record['source']} : {status}", file=sys.stderr)
+            stats = collection.stats()
+            print(f"✅ {count} photo(s) scannée(s) en {time.perf_counter() - start:.1f} s ; collection : "
+                  f"{stats['cards']} carte(s), {stats['species']} espèce(s) sur {stats['pages']} photo(s)",
+                  file=sys.stderr)
+        elif args.command == 'list':
+            inventory = collection.species()
+            if args.json:
+                json.dump(inventory, sys.stdout, indent=2, ensure_ascii=False)
+                print()
+            else:
+                for entry in inventory:
+                    position = f" (ligne {entry['row'] + 1}, colonne {entry['col'] + 1})" if entry['row'] is not None else ''
+                    print(f"{entry['count']:>4} × {entry['name']:<16} confiance {entry['best_confidence']:.0%} "
+                          f"— {entry['source']}{position}")
+        else:
+            for source in args.sources:
+                collection.remove(source)
+    finally:
+        collection.close()
+
+
+if __name__ == '__main__':
+    main()
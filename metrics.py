@@ -0,0 +1,166 @@
+import bisect
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Bornes des histogrammes, en secondes
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+@contextmanager
+def timed(timings, stage):
+    """
+    Ajoute la durée du bloc `with` (en ms) à timings[stage]
+
+    Ne fait rien si `timings` vaut None, pour garder les appels sans mesure gratuits.
+    """
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_since(timings, stage, start)
+
+
+def record_since(timings, stage, start):
+    """Ajoute à timings[stage] le temps écoulé depuis `start` (time.perf_counter)"""
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + (time.perf_counter() - start) * 1000
+
+
+class Histogram:
+    """Histogramme cumulatif façon Prometheus, plus une fenêtre glissante pour les quantiles"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, window=1024):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+        self.recent.append(value)
+
+    def quantile(self, q):
+        if not self.recent:
+            return 0.0
+        values = sorted(self.recent)
+        return values[min(len(values) - 1, int(q * len(values)))]
+
+    def cumulative_counts(self):
+        total, cumulative = 0, []
+        for count in self.counts:
+            total += count
+            cumulative.append(total)
+        return cumulative
+
+
+class MetricsRegistry:
+    """
+    Métriques du scanner : durées par étape et compteurs
+
+    Les durées sont exposées au format texte Prometheus, en histogramme
+    (scanner_stage_duration_seconds) et en quantiles p50/p95/p99 sur les
+    dernières mesures (scanner_stage_latency_seconds).
+    """
+
+    def __init__(self, prefix='scanner'):
+        self.prefix = prefix
+        self._histograms = {}
+        self._counters = {}
+        self._callbacks = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        """Enregistre une durée (en secondes) pour une étape"""
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram()
+            histogram.observe(seconds)
+
+    def observe_timings(self, timings):
+        """Enregistre un dict {étape_ms: durée en ms}, comme celui rempli par timed()"""
+        for stage, ms in timings.items():
+            if isinstance(ms, (int, float)):
+                self.observe(stage[:-3] if stage.endswith('_ms') else stage, ms / 1000)
+
+    def inc(self, name, value=1):
+        """Incrémente un compteur"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def register_callback(self, name, callback, kind='gauge'):
+        """
+        Déclare une valeur lue au moment de l'export
+
+        Args:
+            callback: Fonction sans argument renvoyant la valeur
+            kind: 'gauge' ou 'counter' (pour un total tenu ailleurs, ex. le cache OCR)
+        """
+        with self._lock:
+            self._callbacks[name] = (callback, kind)
+
+    def snapshot(self):
+        """Vue dict des métriques : compteurs et p50/p95/p99 par étape (en ms)"""
+        with self._lock:
+            stages = {
+                stage: {
+                    'count': h.count,
+                    **{f"p{int(q * 100)}_ms": h.quantile(q) * 1000 for q in QUANTILES},
+                }
+                for stage, h in self._histograms.items()
+            }
+            counters = dict(self._counters)
+            callbacks = dict(self._callbacks)
+        counters.update({name: callback() for name, (callback, _) in callbacks.items()})
+        return {'counters': counters, 'stages': stages}
+
+    def render_prometheus(self):
+        """Export au format texte Prometheus"""
+        p = self.prefix
+        lines = []
+        with self._lock:
+            histograms = {stage: h for stage, h in sorted(self._histograms.items())}
+            counters = sorted(self._counters.items())
+            callbacks = sorted(self._callbacks.items())
+
+            lines.append(f"# HELP {p}_stage_duration_seconds Durée de chaque étape du scan")
+            lines.append(f"# TYPE {p}_stage_duration_seconds histogram")
+            for stage, h in histograms.items():
+                for bound, count in zip(h.buckets, h.cumulative_counts()):
+                    lines.append(f'{p}_stage_duration_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}')
+                lines.append(f'{p}_stage_duration_seconds_bucket{{stage="{stage}",le="+Inf"}} {h.count}')
+                lines.append(f'{p}_stage_duration_seconds_sum{{stage="{stage}"}} {h.sum}')
+                lines.append(f'{p}_stage_duration_seconds_count{{stage="{stage}"}} {h.count}')
+
+            lines.append(f"# HELP {p}_stage_latency_seconds Quantiles récents de chaque étape")
+            lines.append(f"# TYPE {p}_stage_latency_seconds summary")
+            for stage, h in histograms.items():
+                for q in QUANTILES:
+                    lines.append(f'{p}_stage_latency_seconds{{stage="{stage}",quantile="{q}"}} {h.quantile(q)}')
+                lines.append(f'{p}_stage_latency_seconds_sum{{stage="{stage}"}} {h.sum}')
+                lines.append(f'{p}_stage_latency_seconds_count{{stage="{stage}"}} {h.count}')
+
+        for name, value in counters:
+            lines.append(f"# TYPE {p}_{name}_total counter")
+            lines.append(f"{p}_{name}_total {value}")
+        for name, (callback, kind) in callbacks:
+            metric = f"{p}_{name}_total" if kind == 'counter' else f"{p}_{name}"
+            lines.append(f"# TYPE {metric} {kind}")
+            lines.append(f"{metric} {callback()}")
+        return '\n'.join(lines) + '\n'
+
+
+# Registre partagé par le processus
+metrics = MetricsRegistry()
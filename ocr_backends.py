@@ -0,0 +1,277 @@
+"""
+Moteurs d'inférence OCR interchangeables
+
+Chaque moteur fournit un Reader au format EasyOCR (detect, recognize,
+readtext_batched). Les boîtes, textes et confiances sont donc identiques pour
+tout le reste du scanner. Le moteur est choisi par déploiement avec
+SCANNER_OCR_BACKEND :
+
+- 'torch' (défaut) : EasyOCR tel quel, sur GPU si disponible. Sur CPU, EasyOCR
+  quantifie déjà dynamiquement les couches LSTM et linéaires en int8.
+- 'onnx' : détecteur CRAFT et recognizer exportés en ONNX (une fois, puis mis
+  en cache sur disque) et exécutés par ONNX Runtime, pour les machines sans GPU.
+- 'onnx-int8' : idem, avec les MatMul et LSTM quantifiés en int8.
+
+ONNX Runtime (onnxruntime) n'est nécessaire que pour les moteurs 'onnx'.
+"""
+import copy
+import hashlib
+import inspect
+import os
+import threading
+
+DEFAULT_BACKEND = 'torch'
+
+# Opérations quantifiées par 'onnx-int8' (comme la quantification dynamique de torch)
+QUANTIZED_OPS = ('MatMul', 'Gemm', 'LSTM')
+
+_export_lock = threading.Lock()
+
+
+class TorchBackend:
+    """Reader EasyOCR PyTorch, sur GPU si disponible"""
+
+    name = 'torch'
+    supports_gpu = True
+
+    def create_reader(self, langs, gpu):
+        import easyocr
+        return easyocr.Reader(list(langs), gpu=gpu, verbose=False)
+
+
+class OnnxBackend:
+    """
+    Reader EasyOCR dont les réseaux tournent dans ONNX Runtime (CPU)
+
+    Args:
+        quantize: Si True, quantifie les poids des MatMul/LSTM en int8
+        cache_dir: Dossier des modèles exportés (défaut : SCANNER_ONNX_DIR, sinon
+            le sous-dossier onnx/ des modèles EasyOCR)
+        threads: Threads ONNX Runtime par session (défaut : SCANNER_ONNX_THREADS,
+            sinon choix d'ONNX Runtime)
+    """
+
+    supports_gpu = False
+
+    def __init__(self, quantize=False, cache_dir=None, threads=None):
+        self.quantize = quantize
+        self.cache_dir = cache_dir
+        self.threads = threads
+
+    @property
+    def name(self):
+        return 'onnx-int8' if self.quantize else 'onnx'
+
+    def create_reader(self, langs, gpu):
+        import easyocr
+        # Poids fp32 : les modules quantifiés par torch ne s'exportent pas
+        reader = easyocr.Reader(list(langs), gpu=False, quantize=False, verbose=False)
+        return convert_reader(reader, self.quantize, self.cache_dir, self.threads)
+
+
+def convert_reader(reader, quantize=False, cache_dir=None, threads=None):
+    """
+    Remplace les réseaux d'un Reader EasyOCR (CPU) par des sessions ONNX Runtime
+
+    Les modèles exportés sont nommés d'après l'empreinte de leurs poids : un
+    changement de modèle EasyOCR provoque un nouvel export. Seul le détecteur
+    CRAFT est converti ; un autre détecteur (DBNet) reste en PyTorch.
+
+    Returns:
+        Le même Reader, modifié
+    """
+    import torch
+
+    cache_dir = cache_dir or os.environ.get('SCANNER_ONNX_DIR') or os.path.join(
+        reader.model_storage_directory, 'onnx')
+    if threads is None and os.environ.get('SCANNER_ONNX_THREADS'):
+        threads = int(os.environ['SCANNER_ONNX_THREADS'])
+
+    if getattr(reader, 'detect_network', 'craft') == 'craft':
+        path = _export(_craft_scores(reader.detector), 'craft', cache_dir, quantize,
+                       torch.zeros(1, 3, 320, 320), {'image': {0: 'batch', 2: 'height', 3: 'width'},
+                                                     'scores': {0: 'batch', 1: 'rows', 2: 'cols'}})
+        reader.detector = OnnxDetector(_session(path, threads), os.path.getsize(path) / (1024 * 1024))
+
+    path = _export(_recognizer_predictions(reader.recognizer), f'recognizer-{reader.model_lang}', cache_dir,
+                   quantize, torch.zeros(2, 1, 64, 128),
+                   {'image': {0: 'batch', 2: 'height', 3: 'width'}, 'scores': {0: 'batch', 1: 'steps'}})
+    reader.recognizer = OnnxRecognizer(_session(path, threads), os.path.getsize(path) / (1024 * 1024))
+    return reader
+
+
+def _weights_digest(module):
+    digest = hashlib.blake2b(digest_size=8)
+    for name, tensor in sorted(module.state_dict().items()):
+        digest.update(name.encode())
+        digest.update(tensor.detach().cpu().contiguous().numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _export(module, prefix, cache_dir, quantize, example, dynamic_axes):
+    """Exporte `module` en ONNX (puis le quantifie) s'il n'est pas déjà en cache ; retourne le chemin"""
+    import torch
+
+    base = os.path.join(cache_dir, f"{prefix}-{_weights_digest(module)}")
+    path = base + ('-int8.onnx' if quantize else '.onnx')
+    with _export_lock:
+        if os.path.exists(path):
+            return path
+        os.makedirs(cache_dir, exist_ok=True)
+        fp32_path = base + '.onnx'
+        if not os.path.exists(fp32_path):
+            options = {'dynamo': False} if 'dynamo' in inspect.signature(torch.onnx.export).parameters else {}
+            tmp_path = fp32_path + '.tmp'
+            with torch.no_grad():
+                torch.onnx.export(module.eval(), example, tmp_path, input_names=['image'], output_names=['scores'],
+                                  dynamic_axes=dynamic_axes, opset_version=17, **options)
+            os.replace(tmp_path, fp32_path)
+        if quantize:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            tmp_path = path + '.tmp'
+            quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QInt8,
+                             op_types_to_quantize=list(QUANTIZED_OPS))
+            os.replace(tmp_path, path)
+    return path
+
+
+def _session(path, threads=None):
+    import onnxruntime
+    options = onnxruntime.SessionOptions()
+    if threads:
+        options.intra_op_num_threads = threads
+    return onnxruntime.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+
+
+def _craft_scores(craft):
+    """
+    CRAFT sans ReLU en place, ne renvoyant que les cartes de scores
+
+    Dans EasyOCR, la ReLU en place qui ouvre chaque tranche du VGG modifie
+    aussi la sortie intermédiaire gardée pour le U-Net ; le traceur ONNX ne
+    reproduit pas cet effet de bord, il est donc rendu explicite.
+    """
+    import torch
+    import torch.nn.functional as F
+
+    class CraftScores(torch.nn.Module):
+        def __init__(self, craft):
+            super().__init__()
+            self.craft = copy.deepcopy(getattr(craft, 'module', craft)).float()
+            base = self.craft.basenet
+            self.slices = [base.slice1, base.slice2, base.slice3, base.slice4, base.slice5]
+            self.relu_after = []
+            for next_slice in self.slices[1:]:
+                first = next(iter(next_slice.children()), None)
+                self.relu_after.append(isinstance(first, torch.nn.ReLU) and first.inplace)
+            for module in self.craft.modules():
+                if isinstance(module, torch.nn.ReLU):
+                    module.inplace = False
+
+        def forward(self, x):
+            outputs = []
+            for index, vgg_slice in enumerate(self.slices):
+                x = vgg_slice(x)
+                outputs.append(F.relu(x) if index < 4 and self.relu_after[index] else x)
+            relu2_2, relu3_2, relu4_3, relu5_3, fc7 = outputs
+            craft = self.craft
+            y = craft.upconv1(torch.cat([fc7, relu5_3], dim=1))
+            y = F.interpolate(y, size=relu4_3.size()[2:], mode='bilinear', align_corners=False)
+            y = craft.upconv2(torch.cat([y, relu4_3], dim=1))
+            y = F.interpolate(y, size=relu3_2.size()[2:], mode='bilinear', align_corners=False)
+            y = craft.upconv3(torch.cat([y, relu3_2], dim=1))
+            y = F.interpolate(y, size=relu2_2.size()[2:], mode='bilinear', align_corners=False)
+            feature = craft.upconv4(torch.cat([y, relu2_2], dim=1))
+            return craft.conv_cls(feature).permute(0, 2, 3, 1)
+
+    return CraftScores(craft)
+
+
+def _recognizer_predictions(model):
+    """
+    Recognizer EasyOCR (générations 1 et 2) sous une forme exportable
+
+    L'AdaptiveAvgPool2d((None, 1)) d'EasyOCR, non exportable avec une largeur
+    variable, est une simple moyenne sur la hauteur.
+    """
+    import torch
+
+    class RecognizerPredictions(torch.nn.Module):
+        def __init__(self, model):
+            super().__init__()
+            self.model = copy.deepcopy(getattr(model, 'module', model)).float()
+
+        def forward(self, image):
+            model = self.model
+            visual_feature = model.FeatureExtraction(image).permute(0, 3, 1, 2).mean(dim=3)
+            contextual_feature = model.SequenceModeling(visual_feature)
+            return model.Prediction(contextual_feature.contiguous())
+
+    return RecognizerPredictions(model)
+
+
+class OnnxDetector:
+    """Remplace le détecteur CRAFT d'un Reader : mêmes entrées et sorties (tenseurs torch)"""
+
+    def __init__(self, session, size_mb=0.0):
+        self.session = session
+        self.size_mb = size_mb
+
+    def __call__(self, x):
+        import torch
+        scores = self.session.run(None, {'image': x.detach().cpu().numpy()})[0]
+        # EasyOCR n'utilise que les scores (la carte de caractéristiques sert à l'affinage)
+        return torch.from_numpy(scores), None
+
+    def eval(self):
+        return self
+
+
+class OnnxRecognizer:
+    """Remplace le recognizer d'un Reader : mêmes entrées et sorties (tenseurs torch)"""
+
+    def __init__(self, session, size_mb=0.0):
+        self.session = session
+        self.size_mb = size_mb
+
+    def __call__(self, image, text=None):
+        import torch
+        return torch.from_numpy(self.session.run(None, {'image': image.detach().cpu().numpy()})[0])
+
+    def eval(self):
+        return self
+
+
+_BACKENDS = {
+    'torch': TorchBackend(),
+    'onnx': OnnxBackend(),
+    'onnx-int8': OnnxBackend(quantize=True),
+}
+
+
+def register_backend(name, backend):
+    """Ajoute un moteur (objet avec name, supports_gpu et create_reader(langs, gpu))"""
+    _BACKENDS[name] = backend
+
+
+def available_backends():
+    return list(_BACKENDS)
+
+
+def get_backend(backend=None):
+    """
+    Retourne un moteur OCR
+
+    Args:
+        backend: Nom ('torch', 'onnx', 'onnx-int8') ou moteur ; par défaut SCANNER_OCR_BACKEND
+
+    Raises:
+        ValueError: si le nom est inconnu
+    """
+    if backend is not None and not isinstance(backend, str):
+        return backend
+    name = backend or os.environ.get('SCANNER_OCR_BACKEND') or DEFAULT_BACKEND
+    try:
+        return _BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Moteur OCR inconnu : {name} (disponibles : {', '.join(_BACKENDS)})") from None
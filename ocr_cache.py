@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+def image_digest(image):
+    """Empreinte du contenu d'une image décodée (pixels, forme et type)"""
+    image = np.ascontiguousarray(image)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{image.shape}|{image.dtype}".encode())
+    digest.update(memoryview(image).cast('B'))
+    return digest.hexdigest()
+
+
+def _to_plain(results):
+    """Convertit la sortie EasyOCR en types Python simples (sérialisables en JSON)"""
+    return [
+        ([[float(x), float(y)] for x, y in bbox], str(text), float(confidence))
+        for bbox, text, confidence in results
+    ]
+
+
+class OCRCache:
+    """
+    Cache des sorties brutes de l'OCR (bbox, texte, confiance)
+
+    La clé combine le contenu de l'image, la langue, le moteur OCR (voir
+    ocr_backends : torch et onnx-int8 ne donnent pas exactement les mêmes
+    lectures) et les réglages de prétraitement : changer seulement similarity_threshold ou size_tolerance
+    réutilise l'OCR déjà fait. Les entrées sont gardées en mémoire (éviction
+    LRU) et, si `path` est fourni, dans une base SQLite qui survit aux
+    redémarrages.
+
+    Args:
+        max_entries: Nombre d'entrées gardées en mémoire (0 = pas de cache mémoire)
+        path: Fichier SQLite pour la persistance sur disque (None = mémoire seule)
+    """
+
+    def __init__(self, max_entries=64, path=None):
+        self.max_entries = max_entries
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS ocr_cache (key TEXT PRIMARY KEY, results TEXT, created REAL)")
+            self._db.commit()
+
+    @classmethod
+    def from_env(cls):
+        """Construit le cache à partir des variables SCANNER_OCR_CACHE_*"""
+        return cls(
+            max_entries=int(os.environ.get('SCANNER_OCR_CACHE_SIZE', '64')),
+            path=os.environ.get('SCANNER_OCR_CACHE_PATH') or None,
+        )
+
+    @staticmethod
+    def make_key(image, lang, backend, **options):
+        """Clé de cache : contenu de l'image + langue + nom du moteur OCR + réglages de prétraitement"""
+        settings = json.dumps(options, sort_keys=True, default=str)
+        return f"{image_digest(image)}|{lang}|{backend}|{settings}"
+
+    def get(self, key):
+        """Retourne les résultats OCR en cache ou None"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            if self._db is not None:
+                row = self._db.execute("SELECT results FROM ocr_cache WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    results = [tuple(r) for r in json.loads(row[0])]
+                    self._remember(key, results)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return results
+            self.misses += 1
+            return None
+
+    def put(self, key, results):
+        """Enregistre les résultats OCR d'une image"""
+        results = _to_plain(results)
+        with self._lock:
+            self._remember(key, results)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO ocr_cache VALUES (?, ?, ?)",
+                                 (key, json.dumps(results, ensure_ascii=False), time.time()))
+                self._db.commit()
+        return results
+
+    def _remember(self, key, results):
+        # Appelé sous verrou
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = results
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        """Compteurs du cache : hits, misses, disk_hits, entrées en mémoire"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'disk_hits': self.disk_hits,
+                'hit_rate': self.hits / total if total else 0.0,
+                'entries': len(self._entries),
+            }
+
+    def clear(self):
+        """Vide le cache mémoire et disque"""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM ocr_cache")
+                self._db.commit()
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_ocr_cache():
+    """Retourne le cache OCR partagé par le processus"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = OCRCache.from_env()
+        return _default_cache
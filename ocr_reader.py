@@ -0,0 +1,211 @@
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from ocr_backends import get_backend
+
+
+def _default_device():
+    """Retourne 'cuda' si un GPU est disponible, sinon 'cpu'"""
+    try:
+        import torch
+        return 'cuda' if torch.cuda.is_available() else 'cpu'
+    except ImportError:
+        return 'cpu'
+
+
+def _estimate_reader_mb(reader):
+    """Estime la mémoire occupée par les poids d'un Reader EasyOCR (en Mo)"""
+    total = 0
+    for model in (getattr(reader, 'detector', None), getattr(reader, 'recognizer', None)):
+        if hasattr(model, 'size_mb'):
+            # Session ONNX Runtime (voir ocr_backends)
+            total += model.size_mb * 1024 * 1024
+        elif hasattr(model, 'parameters'):
+            total += sum(p.numel() * p.element_size() for p in model.parameters())
+    return total / (1024 * 1024)
+
+
+class _ReaderEntry:
+    """Répliques d'un Reader pour un triplet (langues, device, moteur)"""
+
+    def __init__(self, langs, device, backend):
+        self.langs = langs
+        self.device = device
+        self.backend = backend
+        self.idle = []
+        self.created = 0
+        self.in_use = 0
+        self.size_mb = 0.0
+
+
+class ReaderPool:
+    """
+    Registre de Readers EasyOCR partagés par tout le processus
+
+    Chaque Reader est construit une seule fois (à la première demande) pour un
+    triplet (langues, device, moteur), puis réutilisé par toutes les requêtes.
+    Un Reader n'est jamais utilisé par deux threads en même temps : chaque
+    entrée possède jusqu'à `replicas` copies et `acquire` attend qu'une copie
+    soit libre.
+
+    Args:
+        max_memory_mb: Plafond mémoire des poids chargés (None = illimité).
+            Au-delà, les entrées inutilisées les plus anciennes sont évincées.
+        replicas: Nombre maximal de copies par triplet (langues, device, moteur)
+        reader_factory: Fonction (langs, gpu) -> Reader, pour remplacer le moteur
+        backend: Moteur OCR par défaut (voir ocr_backends ; None = SCANNER_OCR_BACKEND)
+    """
+
+    def __init__(self, max_memory_mb=None, replicas=1, reader_factory=None, backend=None):
+        self.max_memory_mb = max_memory_mb
+        self.replicas = max(1, int(replicas))
+        self.reader_factory = reader_factory
+        self.backend = backend
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Réveille les threads en attente d'une copie (rendue, ou construction échouée)
+        self._available = threading.Condition(self._lock)
+
+    @classmethod
+    def from_env(cls):
+        """Construit un pool à partir des variables SCANNER_READER_* et SCANNER_OCR_BACKEND"""
+        max_mb = os.environ.get('SCANNER_READER_MAX_MB')
+        return cls(
+            max_memory_mb=float(max_mb) if max_mb else None,
+            replicas=int(os.environ.get('SCANNER_READER_REPLICAS', '1')),
+            # Un nom de moteur inconnu est signalé dès le démarrage
+            backend=get_backend(os.environ.get('SCANNER_OCR_BACKEND')).name,
+        )
+
+    @staticmethod
+    def _key(langs, device, backend):
+        if isinstance(langs, str):
+            langs = [langs]
+        return tuple(sorted(set(langs))), device, backend
+
+    @property
+    def backend_name(self):
+        """Nom du moteur OCR par défaut du pool (voir ocr_backends)"""
+        return get_backend(self.backend).name
+
+    @property
+    def memory_mb(self):
+        """Mémoire estimée de tous les Readers chargés (en Mo)"""
+        with self._lock:
+            return sum(entry.size_mb for entry in self._entries.values())
+
+    def loaded(self):
+        """Liste des triplets (langues, device, moteur) actuellement chargés"""
+        with self._lock:
+            return list(self._entries.keys())
+
+    @contextmanager
+    def acquire(self, langs, device=None, backend=None):
+        """
+        Emprunte un Reader pour la durée du bloc `with`
+
+        Args:
+            langs: Code de langue ('en') ou liste de codes
+            device: 'cuda' ou 'cpu' (détecté automatiquement si None ; toujours
+                'cpu' pour un moteur sans GPU)
+            backend: Moteur OCR (nom ou objet, voir ocr_backends ; défaut : celui du pool)
+        """
+        backend = get_backend(backend or self.backend)
+        device = (device or _default_device()) if backend.supports_gpu else 'cpu'
+        key = self._key(langs, device, backend.name)
+        factory = self.reader_factory or backend.create_reader
+
+        build = False
+        reader = None
+        with self._available:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _ReaderEntry(key[0], device, backend.name)
+                self._entries[key] = entry
+            self._entries.move_to_end(key)
+            entry.in_use += 1
+            while True:
+                if entry.idle:
+                    reader = entry.idle.pop()
+                    break
+                if entry.created < self.replicas:
+                    entry.created += 1
+                    build = True
+                    break
+                self._available.wait()
+
+        try:
+            if build:
+                try:
+                    reader = factory(key[0], device == 'cuda')
+                except Exception:
+                    with self._available:
+                        entry.created -= 1
+                        # Un thread en attente retente la construction (et reçoit l'erreur s'il échoue aussi)
+                        self._available.notify_all()
+                    raise
+                size_mb = _estimate_reader_mb(reader)
+                with self._lock:
+                    entry.size_mb += size_mb
+                    self._evict(keep=key)
+            yield reader
+        finally:
+            with self._available:
+                entry.in_use -= 1
+                if reader is not None:
+                    entry.idle.append(reader)
+                    self._available.notify_all()
+
+    def _evict(self, keep):
+        """Évince les entrées inutilisées les moins récentes (appelé sous verrou)"""
+        if self.max_memory_mb is None:
+            return
+        total = sum(entry.size_mb for entry in self._entries.values())
+        for key in list(self._entries.keys()):
+            if total <= self.max_memory_mb:
+                break
+            entry = self._entries[key]
+            if key == keep or entry.in_use > 0:
+                continue
+            del self._entries[key]
+            total -= entry.size_mb
+
+    def warmup(self, lang_sets, device=None, backend=None):
+        """
+        Charge à l'avance les Readers demandés
+
+        Args:
+            lang_sets: Liste de langues ou de listes de langues (ex: ['en', 'fr'])
+        """
+        for langs in lang_sets:
+            with self.acquire(langs, device, backend):
+                pass
+
+    def clear(self):
+        """Oublie tous les Readers inutilisés"""
+        with self._lock:
+            for key in [k for k, e in self._entries.items() if e.in_use == 0]:
+                del self._entries[key]
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_reader_pool():
+    """Retourne le pool de Readers partagé par le processus"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ReaderPool.from_env()
+        return _default_pool
+
+
+def warmup_from_env(pool=None):
+    """Précharge les langues listées dans SCANNER_WARMUP_LANGS (ex: 'en,fr')"""
+    langs = [l.strip() for l in os.environ.get('SCANNER_WARMUP_LANGS', '').split(',') if l.strip()]
+    if langs:
+        (pool or get_reader_pool()).warmup(langs)
+    return langs
@@ -0,0 +1,259 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import record_since
+from ocr_reader import get_reader_pool
+
+
+class SchedulerBusy(RuntimeError):
+    """File d'attente pleine : la requête est refusée tout de suite plutôt que d'attendre"""
+
+
+class _Job:
+    """Requête en attente : une image à lire, ou un appel à exécuter seul"""
+
+    __slots__ = ('key', 'image', 'call', 'timings', 'future', 'enqueued')
+
+    def __init__(self, key, image, call, timings, future):
+        self.key = key
+        self.image = image
+        self.call = call
+        self.timings = timings
+        self.future = future
+        self.enqueued = time.perf_counter()
+
+
+class OCRScheduler:
+    """
+    Ordonnanceur asyncio des inférences OCR, avec micro-batching
+
+    Les requêtes arrivées dans la même fenêtre (`window_ms`) et partageant la
+    langue, la taille d'image et les réglages de prétraitement sont lues
+    ensemble par pokemon_detector.run_ocr_batch : un seul appel du détecteur
+    pour le lot, puis le recognizer sur les fragments de toutes les images (par
+    lots sur GPU, un par un sur CPU). Tant que tous les Readers sont occupés,
+    les requêtes s'accumulent et forment le lot suivant, ce qui augmente le
+    débit sans latence illimitée :
+
+      - au-delà de `max_queue` requêtes en attente, submit lève SchedulerBusy
+      - chaque requête a un délai maximal (`timeout_s`, file d'attente comprise)
+
+    Args:
+        max_batch: Nombre maximal d'images par lot
+        window_ms: Attente maximale pour compléter un lot
+        max_queue: Profondeur maximale de la file d'attente
+        timeout_s: Délai par défaut d'une requête, en secondes (None = aucun)
+        workers: Lots traités en parallèle (défaut : répliques du pool de Readers)
+    """
+
+    def __init__(self, max_batch=8, window_ms=10, max_queue=32, timeout_s=60, workers=None):
+        self.max_batch = max(1, int(max_batch))
+        self.window_ms = window_ms
+        self.max_queue = max(1, int(max_queue))
+        self.timeout_s = timeout_s
+        self.workers = workers or get_reader_pool().replicas
+        self.batches = 0
+        self.batched_images = 0
+        self._stats_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='ocr-batch')
+        self._loop = None
+        self._queue = None
+        self._slots = None
+        self._task = None
+
+    @classmethod
+    def from_env(cls):
+        """Construit l'ordonnanceur à partir des variables SCANNER_BATCH_* et SCANNER_QUEUE_MAX"""
+        timeout = os.environ.get('SCANNER_REQUEST_TIMEOUT', '60')
+        return cls(
+            max_batch=int(os.environ.get('SCANNER_BATCH_MAX', '8')),
+            window_ms=float(os.environ.get('SCANNER_BATCH_WINDOW_MS', '10')),
+            max_queue=int(os.environ.get('SCANNER_QUEUE_MAX', '32')),
+            timeout_s=float(timeout) if float(timeout) > 0 else None,
+        )
+
+    def queue_depth(self):
+        """Nombre de requêtes en attente d'un Reader"""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def submit(self, image, lang='en', timeout=None, timings=None, **ocr_options):
+        """
+        Lit les textes d'une image BGR (même résultat que pokemon_detector.run_ocr)
+
+        Raises:
+            SchedulerBusy: si la file d'attente est pleine
+            asyncio.TimeoutError: si la requête dépasse son délai
+        """
+        # Seules les images de même taille partagent un passage du détecteur, qui
+        # redimensionne tout le lot d'après sa plus grande image (voir run_ocr_batch)
+        key = (lang, image.shape[:2], tuple(sorted(ocr_options.items())))
+        return await self._enqueue(_Job(key, image, None, timings, None), timeout)
+
+    async def submit_call(self, func, *args, timeout=None, **kwargs):
+        """
+        Exécute func(*args, **kwargs) dans un lot à part (ex. le mode classeur,
+        qui groupe déjà ses bandeaux), avec la même file d'attente et le même délai
+        """
+        call = (func, args, kwargs)
+        return await self._enqueue(_Job(None, None, call, kwargs.get('timings'), None), timeout)
+
+    async def submit_stream(self, func, *args, timeout=None, **kwargs):
+        """
+        Comme submit_call pour un générateur : ses éléments sont transmis dès
+        qu'ils sont produits, avec la même file d'attente et le même délai
+
+        Le délai court depuis la mise en file et s'applique à tout le flux. Une
+        fois le délai dépassé (ou le flux abandonné), le générateur s'arrête à
+        son élément suivant.
+
+        Raises:
+            SchedulerBusy: si la file d'attente est pleine
+            asyncio.TimeoutError: si le flux dépasse son délai
+        """
+        items = asyncio.Queue()
+        stopped = threading.Event()
+
+        def produce():
+            for item in func(*args, **kwargs):
+                if stopped.is_set():
+                    return
+                self._loop.call_soon_threadsafe(items.put_nowait, item)
+
+        job = _Job(None, None, (produce, (), {}), kwargs.get('timings'), None)
+        self._put(job)
+        timeout = self.timeout_s if timeout is None else timeout
+        deadline = self._loop.time() + timeout if timeout else None
+        try:
+            while True:
+                get = asyncio.ensure_future(items.get())
+                remaining = None if deadline is None else max(0.0, deadline - self._loop.time())
+                done, _ = await asyncio.wait({get, job.future}, timeout=remaining,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if get in done:
+                    yield get.result()
+                    continue
+                get.cancel()
+                if job.future not in done:
+                    raise asyncio.TimeoutError()
+                # Erreur éventuelle du générateur, puis les derniers éléments
+                job.future.result()
+                while not items.empty():
+                    yield items.get_nowait()
+                return
+        finally:
+            stopped.set()
+            # Encore en file : le lot l'ignorera
+            job.future.cancel()
+
+    def _put(self, job):
+        self._ensure_started()
+        job.future = self._loop.create_future()
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise SchedulerBusy(f"{self.max_queue} requêtes déjà en attente") from None
+
+    async def _enqueue(self, job, timeout):
+        self._put(job)
+        timeout = self.timeout_s if timeout is None else timeout
+        # En cas de dépassement, wait_for annule le future : le lot l'ignorera
+        return await asyncio.wait_for(job.future, timeout)
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._task is not None and not self._task.done():
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._slots = asyncio.Semaphore(self.workers)
+        self._task = loop.create_task(self._collect())
+
+    async def _collect(self):
+        """Boucle de regroupement : attend un Reader libre, puis forme le lot suivant"""
+        while True:
+            await self._slots.acquire()
+            batch = [await self._queue.get()]
+            if batch[0].call is None and self._queue.qsize() < self.max_batch - 1:
+                # Laisser aux requêtes simultanées le temps de rejoindre le lot
+                await asyncio.sleep(self.window_ms / 1000)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            batch = [job for job in batch if not job.future.done()]
+            if not batch:
+                self._slots.release()
+                continue
+            task = self._loop.run_in_executor(self._executor, self._process, batch)
+            task.add_done_callback(lambda _: self._slots.release())
+
+    def _process(self, batch):
+        """Exécute un lot dans un thread (groupes de même langue et réglages, puis appels seuls)"""
+        groups = {}
+        for job in batch:
+            record_since(job.timings, 'queue_wait_ms', job.enqueued)
+            if job.call is not None:
+                self._run_call(job)
+            else:
+                groups.setdefault(job.key, []).append(job)
+        for (lang, _, options), jobs in groups.items():
+            self._run_group(lang, dict(options), jobs)
+
+    def _run_call(self, job):
+        func, args, kwargs = job.call
+        try:
+            self._resolve(job, func(*args, **kwargs))
+        except Exception as exc:
+            self._reject(job, exc)
+
+    def _run_group(self, lang, options, jobs):
+        # Import tardif : pokemon_detector importe EasyOCR et le Pokédex
+        from pokemon_detector import run_ocr_batch
+
+        batch_timings = {}
+        try:
+            outputs = run_ocr_batch([job.image for job in jobs], lang, batch_size=self.max_batch,
+                                    timings=batch_timings, **options)
+        except Exception as exc:
+            for job in jobs:
+                self._reject(job, exc)
+            return
+        with self._stats_lock:
+            self.batches += 1
+            self.batched_images += len(jobs)
+        for job, results in zip(jobs, outputs):
+            if job.timings is not None:
+                for stage, ms in batch_timings.items():
+                    job.timings[stage] = job.timings.get(stage, 0.0) + ms
+            self._resolve(job, results)
+
+    def _resolve(self, job, result):
+        self._loop.call_soon_threadsafe(_set_result, job.future, result)
+
+    def _reject(self, job, exc):
+        self._loop.call_soon_threadsafe(_set_exception, job.future, exc)
+
+
+def _set_result(future, result):
+    if not future.done():
+        future.set_result(result)
+
+
+def _set_exception(future, exc):
+    if not future.done():
+        future.set_exception(exc)
+
+
+_default_scheduler = None
+_default_scheduler_lock = threading.Lock()
+
+
+def get_ocr_scheduler():
+    """Retourne l'ordonnanceur OCR partagé par le processus"""
+    global _default_scheduler
+    with _default_scheduler_lock:
+        if _default_scheduler is None:
+            _default_scheduler = OCRScheduler.from_env()
+        return _default_scheduler
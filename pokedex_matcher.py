@@ -0,0 +1,227 @@
+import hashlib
+import json
+import os
+import unicodedata
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+from rapidfuzz import process, fuzz
+
+# Correspondance code de langue OCR → liste du module pokedex
+POKEDEX_BY_LANG = {
+    'en': 'pokedexUS',
+    'fr': 'pokedexFR',
+    'de': 'pokedexAL',
+    'it': 'pokedexIT',
+    'es': 'pokedexES',
+}
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+POKEDEX_SOURCE = os.path.join(_HERE, 'pokedex.py')
+POKEDEX_ARTIFACT = os.path.join(_HERE, 'pokedex.json')
+
+
+def pokedex_source_digest(path=POKEDEX_SOURCE):
+    """Empreinte de pokedex.py, enregistrée dans l'artefact pour détecter une version périmée"""
+    with open(path, 'rb') as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+def load_pokedexes(path=POKEDEX_ARTIFACT):
+    """
+    Charge les cinq listes du Pokédex {code de langue: noms}
+
+    Lit l'artefact compact pokedex.json (voir build_pokedex.py), bien plus
+    rapide à charger que le module pokedex quand son .pyc n'existe pas encore
+    (démarrage à froid, nouveau worker). S'il manque ou ne correspond plus à
+    pokedex.py, les listes sont lues dans le module.
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            artifact = json.load(f)
+        if not os.path.exists(POKEDEX_SOURCE) or artifact.get('source') == pokedex_source_digest():
+            return {lang: artifact['pokedex'][lang] for lang in POKEDEX_BY_LANG}
+    except (OSError, ValueError, KeyError):
+        pass
+    import pokedex
+    return {lang: getattr(pokedex, attr) for lang, attr in POKEDEX_BY_LANG.items()}
+
+
+def normalize_name(text):
+    """
+    Normalise un nom pour la comparaison floue
+
+    Minuscules, accents retirés et uniquement des lettres, comme le texte OCR
+    nettoyé : "Mr.Mime" → "mrmime", "Farfetch'd" → "farfetchd", "Salamèche" → "salameche"
+    """
+    text = unicodedata.normalize('NFKD', text).casefold()
+    return ''.join(c for c in text if c.isalpha() and not unicodedata.combining(c))
+
+
+def letter_counts(text):
+    """Histogramme des lettres a-z d'un nom normalisé (27e case : autres lettres)"""
+    codes = np.frombuffer(text.encode('ascii', 'replace'), np.uint8).astype(np.intp) - ord('a')
+    codes[(codes < 0) | (codes > 25)] = 26
+    return np.bincount(codes, minlength=27).astype(np.uint8)
+
+
+class _NameIndex:
+    """
+    Noms normalisés triés par longueur, avec leur histogramme de lettres
+
+    Sert à écarter avant RapidFuzz les noms qui ne peuvent pas atteindre le
+    seuil : fuzz.ratio vaut au plus 200 * commun / (a + b), où commun est le
+    nombre de lettres partagées (avec multiplicité) par deux chaînes de
+    longueurs a et b.
+    """
+
+    def __init__(self, entries):
+        # entries : liste de (nom normalisé, nom affiché, langue)
+        entries = sorted(entries, key=lambda e: len(e[0]))
+        self.keys = [e[0] for e in entries]
+        self.names = [e[1] for e in entries]
+        self.langs = [e[2] for e in entries]
+        self.lengths = [len(k) for k in self.keys]
+        self._lengths = np.array(self.lengths, dtype=np.int32)
+        # Transposé (lettre, nom) : on ne lit que les lignes des lettres de la requête.
+        # Histogrammes de tous les noms en un seul bincount (même codage que letter_counts)
+        codes = np.frombuffer(''.join(self.keys).encode('ascii', 'replace'), np.uint8).astype(np.intp) - ord('a')
+        codes[(codes < 0) | (codes > 25)] = 26
+        rows = np.repeat(np.arange(len(self.keys)), self._lengths)
+        self._counts = np.bincount(codes * len(self.keys) + rows,
+                                   minlength=27 * len(self.keys)).reshape(27, -1).astype(np.uint8)
+
+    def candidate_range(self, length, score_cutoff):
+        """Tranche [début, fin) des noms dont la longueur permet d'atteindre le seuil"""
+        if score_cutoff <= 0 or length == 0:
+            return 0, len(self.keys)
+        if score_cutoff >= 200:
+            return 0, 0
+        min_len = length * score_cutoff / (200 - score_cutoff)
+        max_len = length * (200 - score_cutoff) / score_cutoff
+        return bisect_left(self.lengths, min_len), bisect_right(self.lengths, max_len)
+
+    def candidates(self, query, score_cutoff):
+        """Positions des noms pouvant atteindre `score_cutoff` face à `query`"""
+        start, end = self.candidate_range(len(query), score_cutoff)
+        if start >= end or score_cutoff <= 0:
+            return np.arange(start, end)
+        counts = letter_counts(query)
+        letters = np.flatnonzero(counts)
+        common = np.minimum(self._counts[letters, start:end], counts[letters, None]).sum(0, dtype=np.int32)
+        keep = 200 * common >= score_cutoff * (self._lengths[start:end] + len(query))
+        return np.flatnonzero(keep) + start
+
+
+class PokedexMatcher:
+    """
+    Correspondance floue entre un texte OCR et les noms du Pokédex
+
+    Les noms sont normalisés une seule fois à la construction et indexés par
+    longueur et par lettres, pour ne scorer avec RapidFuzz que les candidats
+    capables d'atteindre le seuil.
+
+    Args:
+        pokedexes: Dictionnaire {code de langue: liste de noms}
+        workers: Threads de match_many par défaut (-1 = tous les cœurs)
+    """
+
+    def __init__(self, pokedexes, workers=-1):
+        self.languages = list(pokedexes)
+        self.workers = workers
+        self._indexes = {}
+        all_entries = {}
+        for lang, names in pokedexes.items():
+            entries = {}
+            for name in names:
+                key = normalize_name(name)
+                if key:
+                    entries.setdefault(key, (key, name, lang))
+                    all_entries.setdefault(key, (key, name, lang))
+            self._indexes[lang] = _NameIndex(entries.values())
+        # Index multi-langues : en cas de doublon, la première langue l'emporte
+        self._indexes['all'] = _NameIndex(all_entries.values())
+
+    @classmethod
+    def from_pokedex(cls):
+        """
+        Construit le matcher à partir des cinq listes du Pokédex (voir load_pokedexes)
+
+        Le nombre de threads de match_many vient de SCANNER_MATCH_THREADS (défaut :
+        tous les cœurs ; les workers de worker_pool le limitent à leurs propres threads).
+        """
+        return cls(load_pokedexes(), workers=int(os.environ.get('SCANNER_MATCH_THREADS', '-1')))
+
+    def _index(self, lang):
+        # Langue inconnue (ou 'all') : recherche dans tous les Pokédex
+        return self._indexes.get(lang, self._indexes['all'])
+
+    def match(self, text, lang='en', score_cutoff=0):
+        """
+        Cherche le nom de Pokémon le plus proche d'un texte
+
+        Args:
+            text: Texte OCR (brut ou nettoyé)
+            lang: Langue du Pokédex à utiliser ('en', 'fr', 'de', 'it', 'es' ou 'all')
+            score_cutoff: Similitude minimale (0-100), permet d'écarter plus de candidats
+
+        Returns:
+            Tuple (nom, similitude, langue) ou None si aucun nom n'atteint le seuil
+        """
+        query = normalize_name(text)
+        if not query:
+            return None
+        index = self._index(lang)
+        if score_cutoff <= 0:
+            _, score, position = process.extractOne(query, index.keys, scorer=fuzz.ratio)
+            return index.names[position], score, index.langs[position]
+
+        positions = index.candidates(query, score_cutoff)
+        if len(positions) == 0:
+            return None
+        keys = index.keys
+        result = process.extractOne(query, [keys[i] for i in positions], scorer=fuzz.ratio,
+                                    score_cutoff=score_cutoff)
+        if result is None:
+            return None
+        position = int(positions[result[2]])
+        return index.names[position], result[1], index.langs[position]
+
+    def match_many(self, texts, lang='en', score_cutoff=0, workers=None):
+        """
+        Cherche le meilleur nom pour chaque texte, en un seul appel natif
+
+        Calcule la matrice textes × Pokédex avec rapidfuzz.process.cdist
+        (multi-thread via `workers`) puis garde le meilleur score de chaque ligne.
+
+        Args:
+            texts: Liste de textes OCR
+            lang: Langue du Pokédex ('en', 'fr', 'de', 'it', 'es' ou 'all')
+            score_cutoff: Les scores inférieurs sont ramenés à 0
+            workers: Nombre de threads pour cdist (-1 = tous les cœurs ; None = self.workers)
+
+        Returns:
+            Tuple (noms, scores, langues) : listes parallèles à `texts` ; le nom
+            et la langue valent None si aucun nom n'atteint le seuil
+        """
+        if not texts:
+            return [], np.zeros(0), []
+        index = self._index(lang)
+        queries = [normalize_name(t) for t in texts]
+        matrix = process.cdist(queries, index.keys, scorer=fuzz.ratio, dtype=np.float64,
+                               score_cutoff=score_cutoff, workers=self.workers if workers is None else workers)
+        best = matrix.argmax(axis=1)
+        scores = matrix[np.arange(len(queries)), best]
+        names, langs = [], []
+        for position, score in zip(best.tolist(), scores.tolist()):
+            if score > 0 and score >= score_cutoff:
+                names.append(index.names[position])
+                langs.append(index.langs[position])
+            else:
+                names.append(None)
+                langs.append(None)
+        return names, scores, langs
+
+
+# Construit une seule fois à l'import
+default_matcher = PokedexMatcher.from_pokedex()
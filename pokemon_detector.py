@@ -1,8 +1,13 @@
-import easyocr
+import time
 import cv2
-from rapidfuzz import process, fuzz
-from pokedex import pokedexUS  # liste des noms de Pokémon (str)
+from PIL import Image
+from pokedex_matcher import default_matcher  # index des noms du Pokédex (5 langues)
 import numpy as np
+from ocr_reader import get_reader_pool
+from binder_grid import segment_binder_page, name_band
+from preprocess import prepare_image, rescale_results
+from ocr_cache import get_ocr_cache
+from metrics import timed, record_since
 
 
 
@@ -21,142 +26,689 @@ def calculate_text_size(bbox):
     area = width * height
     return area, width, height
 
-def detect_pokemon_name(image_path, lang='en', similarity_threshold=72, size_tolerance=0.3, verbose=False):
+def load_image(image):
+    """
+    Convertit une image en mémoire en array BGR utilisable par OpenCV / EasyOCR
+    
+    Args:
+        image: Array numpy RGB/RGBA/niveaux de gris, image PIL ou bytes encodés (PNG, JPG...)
+    
+    Returns:
+        Array numpy BGR (ou niveaux de gris), ou None si l'image est illisible
+    
+    Les conversions RGB→BGR se font par une vue inversée sur les canaux, sans copie.
+    """
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        # cv2.imdecode renvoie directement du BGR
+        return cv2.imdecode(np.frombuffer(image, np.uint8), cv2.IMREAD_COLOR)
+    
+    if isinstance(image, Image.Image):
+        if image.mode not in ('RGB', 'RGBA', 'L'):
+            image = image.convert('RGB')
+        image = np.asarray(image)
+    
+    if not isinstance(image, np.ndarray):
+        raise TypeError(f"Type d'image non supporté : {type(image).__name__}")
+    
+    if image.ndim == 2:
+        return image
+    if image.ndim == 3 and image.shape[2] == 1:
+        return image[:, :, 0]
+    if image.ndim == 3 and image.shape[2] in (3, 4):
+        # RGB(A) → BGR : vue inversée, le canal alpha est ignoré
+        return image[:, :, 2::-1]
+    raise ValueError(f"Forme d'image non supportée : {image.shape}")
+
+def run_ocr(image, lang='en', max_side=None, grayscale=False, normalize_contrast=False,
+            canvas_size=2560, mag_ratio=1.0, use_cache=True, timings=None):
+    """
+    Lit les textes d'une image BGR avec le Reader partagé
+    
+    Args:
+        image: Image BGR déjà décodée
+        lang: Langue pour l'OCR ('en', 'fr', etc.)
+        max_side: Taille maximale du grand côté avant OCR (None = taille d'origine)
+        grayscale: Si True, OCR sur l'image en niveaux de gris
+        normalize_contrast: Si True, égalisation du contraste (CLAHE) avant OCR
+        canvas_size: Taille maximale de l'image pour le détecteur EasyOCR
+        mag_ratio: Facteur d'agrandissement du détecteur EasyOCR
+        use_cache: Si True, réutilise l'OCR d'une image identique (voir ocr_cache)
+        timings: Dict optionnel, complété avec la durée (ms) de chaque étape
+    
+    Returns:
+        Liste de (bbox, texte, confiance), bbox en coordonnées de l'image d'origine
+    """
+    return run_ocr_batch([image], lang, max_side, grayscale, normalize_contrast, canvas_size, mag_ratio,
+                         use_cache, batch_size=1, timings=timings)[0]
+
+def run_ocr_batch(images, lang='en', max_side=None, grayscale=False, normalize_contrast=False,
+                  canvas_size=2560, mag_ratio=1.0, use_cache=True, batch_size=8, timings=None):
+    """
+    Lit les textes de plusieurs images BGR en un seul passage du Reader
+    
+    Les images de même taille (après prétraitement) sont empilées pour que le
+    détecteur les traite en un appel. Le détecteur redimensionne tout le lot
+    d'après sa plus grande taille : des images de tailles différentes sont donc
+    lues dans des appels séparés, et chacune donne exactement le résultat de
+    run_ocr seule. Les versions en niveaux de gris d'un même groupe sont
+    ensuite empilées verticalement pour un seul appel du recognizer, puis
+    chaque fragment est rendu à son image. Sur GPU, EasyOCR lit les fragments
+    par lots de `batch_size` ; sur CPU, il les lit toujours un par un (quel que
+    soit `batch_size`) et seul le détecteur profite du lot.
+    
+    Args:
+        images: Liste d'images BGR déjà décodées
+        batch_size: Taille des lots du recognizer EasyOCR (sur GPU seulement)
+        timings: Dict optionnel, complété avec la durée (ms) de chaque étape du lot
+        Autres arguments : voir run_ocr (communs à tout le lot)
+    
+    Returns:
+        Liste de résultats OCR (comme run_ocr), dans l'ordre des images
+    """
+    outputs = [None] * len(images)
+    keys = [None] * len(images)
+    cache = get_ocr_cache() if use_cache else None
+    if cache is not None:
+        with timed(timings, 'cache_lookup_ms'):
+            backend = get_reader_pool().backend_name
+            for i, image in enumerate(images):
+                keys[i] = cache.make_key(image, lang, backend, max_side=max_side, grayscale=grayscale,
+                                         normalize_contrast=normalize_contrast, canvas_size=canvas_size,
+                                         mag_ratio=mag_ratio)
+                outputs[i] = cache.get(keys[i])
+    pending = [i for i, results in enumerate(outputs) if results is None]
+    if not pending:
+        return outputs
+    
+    # Import tardif : easyocr charge torch (plusieurs secondes), inutile tant qu'aucune image n'est lue
+    from easyocr.utils import reformat_input
+    
+    with timed(timings, 'preprocess_ms'):
+        prepared = [prepare_image(images[i], max_side, grayscale, normalize_contrast) for i in pending]
+        inputs = [reformat_input(img) for img, _ in prepared]
+        # Un passage du détecteur par taille d'image (voir plus haut)
+        groups = {}
+        for k, (_, grey) in enumerate(inputs):
+            groups.setdefault(grey.shape[:2], []).append(k)
+    
+    per_image = [[] for _ in pending]
+    # Reader partagé par le processus (chargé une seule fois par langue)
+    start = time.perf_counter()
+    with get_reader_pool().acquire(lang) as reader:
+        record_since(timings, 'reader_acquire_ms', start)
+        for (height, _), members in groups.items():
+            if len(members) == 1:
+                img, img_cv_grey = inputs[members[0]]
+            else:
+                img = np.stack([inputs[k][0] for k in members])
+                img_cv_grey = np.concatenate([inputs[k][1] for k in members])
+            
+            # Équivalent de reader.readtext, découpé pour mesurer chaque étape
+            with timed(timings, 'ocr_detection_ms'):
+                horizontal_lists, free_lists = reader.detect(img, canvas_size=canvas_size, mag_ratio=mag_ratio,
+                                                             reformat=False)
+            
+            # Boîtes de chaque image décalées vers sa place dans l'empilement
+            horizontal_list, free_list = [], []
+            for n, (h_list, f_list) in enumerate(zip(horizontal_lists, free_lists)):
+                top = n * height
+                horizontal_list += [[x_min, x_max, max(y_min, 0) + top, min(y_max, height) + top]
+                                    for x_min, x_max, y_min, y_max in h_list]
+                free_list += [[[x, y + top] for x, y in box] for box in f_list]
+            
+            with timed(timings, 'ocr_recognition_ms'):
+                results = reader.recognize(img_cv_grey, horizontal_list, free_list, batch_size=batch_size,
+                                           reformat=False)
+            
+            for bbox, text, confidence in results:
+                n = min(max(int(np.mean([y for _, y in bbox]) // height), 0), len(members) - 1)
+                top = n * height
+                per_image[members[n]].append(([[x, y - top] for x, y in bbox], text, confidence)
+                                             if top else (bbox, text, confidence))
+    
+    for k, i in enumerate(pending):
+        results = rescale_results(per_image[k], prepared[k][1])
+        if cache is not None:
+            results = cache.put(keys[i], results)
+        outputs[i] = results
+    return outputs
+
+def detect_pokemon_name(image_path, lang='en', similarity_threshold=72, size_tolerance=0.3, verbose=False,
+                        timings=None, **ocr_options):
     """
     Détecte le nom de Pokémon en se concentrant sur les textes de taille similaire
     
     Args:
-        image_path: Chemin vers l'image
+        image_path: Chemin vers l'image (ou image en mémoire, voir detect_pokemon_name_from_image)
         lang: Langue pour l'OCR ('en', 'fr', etc.)
         similarity_threshold: Seuil de similitude minimum
         size_tolerance: Tolérance pour la taille (0.3 = ±30% de la taille de référence)
         verbose: Si True, affiche les détails du processus
+        timings: Dict optionnel, complété avec la durée (ms) de chaque étape
+        **ocr_options: Prétraitement et réglages EasyOCR (voir run_ocr)
     
     Returns:
         Liste des noms de Pokémon détectés ou None si aucun
     """
-    image = cv2.imread(image_path)
+    if not isinstance(image_path, str):
+        return detect_pokemon_name_from_image(image_path, lang, similarity_threshold, size_tolerance, verbose,
+                                              timings, **ocr_options)
+    
+    with timed(timings, 'decode_ms'):
+        image = cv2.imread(image_path)
     if image is None:
         if verbose:
             print(f"❌ Impossible de charger l'image : {image_path}")
         return None
+    return _detect_pokemon_name_bgr(image, lang, similarity_threshold, size_tolerance, verbose, timings, ocr_options)
+
+def detect_pokemon_name_from_image(image, lang='en', similarity_threshold=72, size_tolerance=0.3, verbose=False,
+                                   timings=None, **ocr_options):
+    """
+    Comme detect_pokemon_name, mais à partir d'une image déjà en mémoire (aucun fichier)
+    
+    Args:
+        image: Array numpy RGB, image PIL ou bytes encodés (voir load_image)
+    
+    Returns:
+        Liste des noms de Pokémon détectés ou None si aucun
+    """
+    with timed(timings, 'decode_ms'):
+        bgr = load_image(image)
+    if bgr is None:
+        if verbose:
+            print("❌ Impossible de décoder l'image")
+        return None
+    return _detect_pokemon_name_bgr(bgr, lang, similarity_threshold, size_tolerance, verbose, timings, ocr_options)
+
+def _detect_pokemon_name_bgr(image, lang, similarity_threshold, size_tolerance, verbose, timings, ocr_options):
+    """Pipeline de détection sur une image BGR déjà décodée"""
     print("Image received!")
-    h, w, _ = image.shape
-    final_result = None
+    results = run_ocr(image, lang, timings=timings, **ocr_options)
+    return match_ocr_results(results, lang, similarity_threshold, size_tolerance, verbose, timings)
+
+def ocr_fragments(results):
+    """
+    Représentation en colonnes de la sortie OCR, limitée aux textes contenant des lettres
     
-    reader =  easyocr.Reader([lang], gpu=True)
-    results = reader.readtext(image)
+    Args:
+        results: Liste de (bbox, texte, confiance) renvoyée par EasyOCR
     
-    # Première passe : analyser tous les textes et leurs tailles
-    text_data = []
-    for result in results:
-        bbox, text, confidence = result
+    Returns:
+        Tuple (textes, textes nettoyés, bbox en array (N, 4, 2), confiances en array (N,))
+    """
+    texts, cleaned_texts, boxes, confidences = [], [], [], []
+    for bbox, text, confidence in results:
         cleaned_text = ''.join([c for c in text if c.isalpha()])
-        
-        if not cleaned_text:
-            continue
-            
-        area, width, height = calculate_text_size(bbox)
-        text_data.append({
-            'bbox': bbox,
-            'text': text,
-            'cleaned_text': cleaned_text,
-            'confidence': confidence,
-            'area': area,
-            'width': width,
-            'height': height
-        })
+        if cleaned_text:
+            texts.append(text)
+            cleaned_texts.append(cleaned_text)
+            boxes.append(bbox)
+            confidences.append(confidence)
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4, 2)
+    return texts, cleaned_texts, boxes, np.asarray(confidences, dtype=np.float64)
+
+def match_ocr_results(results, lang='en', similarity_threshold=72, size_tolerance=0.3, verbose=False, timings=None):
+    """
+    Applique les deux passes de correspondance à la sortie brute de reader.readtext
+    
+    Les fragments sont gardés en colonnes (voir ocr_fragments) : tailles, tri et
+    filtres de la deuxième passe sont calculés sur des arrays en une seule
+    opération, et les dicts de résultat ne sont construits qu'à la fin.
+    
+    Args:
+        results: Liste de (bbox, texte, confiance) renvoyée par EasyOCR
+        lang: Langue du Pokédex utilisé pour la correspondance
+        timings: Dict optionnel, complété avec la durée (ms) de chaque étape
+    
+    Returns:
+        Liste de dicts (name, similarity, confidence, lang, bbox) ou None si aucun ;
+        bbox = (x, y, largeur, hauteur) du texte reconnu
+    """
+    texts, cleaned_texts, boxes, confidences = ocr_fragments(results)
+    
+    # Largeur, hauteur et aire (proxy de la taille du texte) de toutes les bbox
+    corners = boxes.min(axis=1)
+    extents = boxes.max(axis=1) - corners
+    widths, heights = extents[:, 0], extents[:, 1]
+    areas = widths * heights
+    
+    # Trier par taille décroissante (les plus gros textes d'abord, tri stable)
+    order = np.argsort(-areas, kind='stable')
+    areas, widths, heights, confidences = areas[order], widths[order], heights[order], confidences[order]
+    corners = corners[order]
+    texts = [texts[i] for i in order]
+    cleaned_texts = [cleaned_texts[i] for i in order]
     
-    # Trier par taille décroissante (les plus gros textes d'abord)
-    text_data.sort(key=lambda x: x['area'], reverse=True)
+    # Une seule matrice fragments × Pokédex (rapidfuzz cdist) pour les deux passes
+    with timed(timings, 'matching_ms'):
+        matches, scores, match_langs = default_matcher.match_many(cleaned_texts, lang,
+                                                                  score_cutoff=similarity_threshold)
+    
+    def describe(i, size_only=False):
+        if size_only:
+            print(f"- Texte (taille compatible) : {texts[i]} → {cleaned_texts[i]}")
+            print(f"  Confiance OCR : {confidences[i]*100:.2f}% | Taille : {areas[i]:.0f}")
+        else:
+            print(f"- Texte : {texts[i]} → nettoyé : {cleaned_texts[i]}")
+            print(f"  Confiance OCR : {confidences[i]*100:.2f}% | Taille : {areas[i]:.0f} (W:{widths[i]:.0f}, H:{heights[i]:.0f})")
+        print(f"  ➤ Comparé à pokédex : {matches[i]} (similitude : {float(scores[i])}%)")
     
     if verbose:
         print("\n=== PREMIÈRE PASSE : Recherche du Pokémon de référence ===")
     
-    reference_pokemon = None
-    reference_size = None
+    pass_start = time.perf_counter()
     
-    # Chercher le premier Pokémon dans les plus gros textes
-    for data in text_data:
-        if verbose:
-            print(f"- Texte : {data['text']} → nettoyé : {data['cleaned_text']}")
-            print(f"  Confiance OCR : {data['confidence']*100:.2f}% | Taille : {data['area']:.0f} (W:{data['width']:.0f}, H:{data['height']:.0f})")
-        
-        match, score, *_ = process.extractOne(data['cleaned_text'], pokedexUS, scorer=fuzz.ratio)
-        
-        if verbose:
-            print(f"  ➤ Comparé à pokédex : {match} (similitude : {score}%)")
-        
-        if score > similarity_threshold:
-            reference_pokemon = match
-            reference_size = data['area']
-            if verbose:
-                print(f"  ✅ POKÉMON DE RÉFÉRENCE TROUVÉ : {reference_pokemon}")
-                print(f"  📏 Taille de référence : {reference_size:.0f}")
-            break
+    # Le premier Pokémon dans les plus gros textes sert de référence
+    above_threshold = scores > similarity_threshold
+    hits = np.flatnonzero(above_threshold)
+    reference = int(hits[0]) if len(hits) else None
     
-    if reference_pokemon is None:
+    if verbose:
+        for i in range(len(texts) if reference is None else reference + 1):
+            describe(i)
+        if reference is not None:
+            print(f"  ✅ POKÉMON DE RÉFÉRENCE TROUVÉ : {matches[reference]}")
+            print(f"  📏 Taille de référence : {areas[reference]:.0f}")
+    
+    record_since(timings, 'pass1_ms', pass_start)
+    
+    if reference is None:
         if verbose:
             print("\n❌ Aucun Pokémon de référence trouvé.")
         return None
     
+    pass_start = time.perf_counter()
+    
     # Deuxième passe : se concentrer sur les textes de taille similaire
     if verbose:
         print(f"\n=== DEUXIÈME PASSE : Recherche dans les textes de taille similaire ===")
     
+    reference_size = areas[reference]
     size_min = reference_size * (1 - size_tolerance)
     size_max = reference_size * (1 + size_tolerance)
     
     if verbose:
         print(f"Recherche dans la plage de taille : {size_min:.0f} - {size_max:.0f}")
     
-    best_matches = []
-    best_scores = []
-    best_confidences = []
+    # Fenêtre de taille, seuil de similitude et confiance OCR en une seule opération
+    in_size = (areas >= size_min) & (areas <= size_max)
+    selected = np.flatnonzero(in_size & above_threshold & (confidences > 0.15))
     
-    for data in text_data:
-        # Filtrer par taille
-        if not (size_min <= data['area'] <= size_max):
-            continue
-            
-        if verbose:
-            print(f"- Texte (taille compatible) : {data['text']} → {data['cleaned_text']}")
-            print(f"  Confiance OCR : {data['confidence']*100:.2f}% | Taille : {data['area']:.0f}")
-        
-        match, score, *_ = process.extractOne(data['cleaned_text'], pokedexUS, scorer=fuzz.ratio)
-        
-        if verbose:
-            print(f"  ➤ Comparé à pokédex : {match} (similitude : {score}%)")
-        
-        if score > similarity_threshold and data['confidence'] > 0.15:
-            best_matches.append(match)
-            best_scores.append(score)
-            best_confidences.append(data['confidence'])
-            if verbose:
+    if verbose:
+        validated = set(selected.tolist())
+        for i in np.flatnonzero(in_size).tolist():
+            describe(i, size_only=True)
+            if i in validated:
                 print(f"  ✅ MATCH VALIDÉ")
     
-    if len(best_matches) > 0:
-        if verbose:
-            print(f"\n🎯 RÉSULTATS FINAUX : {len(best_matches)} Pokémon(s) trouvé(s)")
-            for i, (match, score, conf) in enumerate(zip(best_matches, best_scores, best_confidences)):
-                print(f"  {i+1}. {match} (similitude: {score}%, confiance OCR: {conf*100:.2f}%)")
-        
+    final_result = None
+    if len(selected) > 0:
         # Retourner des objets avec plus d'informations pour l'API
-        final_result = []
-        for match, score, conf in zip(best_matches, best_scores, best_confidences):
-            final_result.append({
-                'name': match,
-                'similarity': score,
-                'confidence': conf
-            })
+        final_result = [
+            {'name': matches[i], 'similarity': score, 'confidence': confidence, 'lang': match_langs[i],
+             'bbox': [x, y, width, height]}
+            for i, score, confidence, (x, y), width, height in zip(
+                selected.tolist(), scores[selected].tolist(), confidences[selected].tolist(),
+                corners[selected].tolist(), widths[selected].tolist(), heights[selected].tolist())
+        ]
+        if verbose:
+            print(f"\n🎯 RÉSULTATS FINAUX : {len(final_result)} Pokémon(s) trouvé(s)")
+            for i, result in enumerate(final_result):
+                print(f"  {i+1}. {result['name']} (similitude: {result['similarity']}%, confiance OCR: {result['confidence']*100:.2f}%)")
     else:
         if verbose:
             print("\n❌ Aucun nom trouvé avec une similitude suffisante dans la plage de taille.")
     
+    record_since(timings, 'pass2_ms', pass_start)
     return final_result
 
+# Fragments reconnus par appel au recognizer pendant la deuxième passe en flux
+STREAM_CHUNK = 4
+
+def iter_pokemon_names(image, lang='en', similarity_threshold=72, size_tolerance=0.3, verbose=False,
+                       timings=None, **ocr_options):
+    """
+    Variante en flux de detect_pokemon_name : chaque Pokémon validé est renvoyé dès qu'il est reconnu
+    
+    Après la détection, les zones de texte sont lues de la plus grande à la plus
+    petite. Le Pokémon de référence (première passe) est renvoyé dès sa
+    découverte. Ensuite, seules les zones de la plage de taille sont lues, et
+    chaque nom validé est renvoyé aussitôt. Les résultats et leur ordre sont
+    ceux de detect_pokemon_name. Une fois le dernier Pokémon renvoyé, les zones
+    restantes sont lues et l'OCR complet est mis en cache (si use_cache).
+    
+    Args:
+        image: Chemin, array numpy RGB, image PIL ou bytes encodés
+        timings: Dict optionnel, complété avec la durée (ms) de chaque étape,
+            dont first_result_ms (délai avant le premier Pokémon)
+        Autres arguments : voir detect_pokemon_name
+    
+    Yields:
+        Dicts (name, similarity, confidence, lang, bbox), dans l'ordre de detect_pokemon_name
+    """
+    start = time.perf_counter()
+    with timed(timings, 'decode_ms'):
+        bgr = cv2.imread(image) if isinstance(image, str) else load_image(image)
+    if bgr is None:
+        if verbose:
+            print("❌ Impossible de charger l'image")
+        return
+    for result in _iter_pokemon_names_bgr(bgr, lang, similarity_threshold, size_tolerance, verbose, timings,
+                                          **ocr_options):
+        if timings is not None and 'first_result_ms' not in timings:
+            timings['first_result_ms'] = (time.perf_counter() - start) * 1000
+        yield result
+
+def _iter_pokemon_names_bgr(image, lang='en', similarity_threshold=72, size_tolerance=0.3, verbose=False,
+                            timings=None, max_side=None, grayscale=False, normalize_contrast=False,
+                            canvas_size=2560, mag_ratio=1.0, use_cache=True):
+    """Deux passes de correspondance entrelacées avec la lecture OCR, sur une image BGR décodée"""
+    cache = get_ocr_cache() if use_cache else None
+    if cache is not None:
+        with timed(timings, 'cache_lookup_ms'):
+            key = cache.make_key(image, lang, get_reader_pool().backend_name, max_side=max_side,
+                                 grayscale=grayscale, normalize_contrast=normalize_contrast,
+                                 canvas_size=canvas_size, mag_ratio=mag_ratio)
+            cached = cache.get(key)
+        if cached is not None:
+            yield from match_ocr_results(cached, lang, similarity_threshold, size_tolerance, verbose, timings) or []
+            return
+    
+    from easyocr.utils import reformat_input
+    
+    with timed(timings, 'preprocess_ms'):
+        prepared, scale = prepare_image(image, max_side, grayscale, normalize_contrast)
+        img, img_cv_grey = reformat_input(prepared)
+    
+    pool = get_reader_pool()
+    start = time.perf_counter()
+    with pool.acquire(lang) as reader:
+        record_since(timings, 'reader_acquire_ms', start)
+        with timed(timings, 'ocr_detection_ms'):
+            horizontal_lists, free_lists = reader.detect(img, canvas_size=canvas_size, mag_ratio=mag_ratio,
+                                                         reformat=False)
+    
+    # Zones dans l'ordre de la sortie de recognize (horizontales puis libres), avec les
+    # coordonnées que recognize renverra (bornées à l'image) : même tri stable que match_ocr_results
+    # (le dernier élément est la position de la zone dans cette sortie, pour remplir le cache)
+    height, width = img_cv_grey.shape[:2]
+    regions = []
+    for x_min, x_max, y_min, y_max in horizontal_lists[0]:
+        x_min, x_max, y_min, y_max = max(0, x_min), min(x_max, width), max(0, y_min), min(y_max, height)
+        regions.append(('h', [x_min, x_max, y_min, y_max], (x_min, y_min, x_max, y_max),
+                        (x_max - x_min) * (y_max - y_min), len(regions)))
+    for box in free_lists[0]:
+        points = np.asarray(box, dtype=np.float64)
+        extent = points.max(axis=0) - points.min(axis=0)
+        regions.append(('f', box, tuple(points.ravel().tolist()), extent[0] * extent[1], len(regions)))
+    regions.sort(key=lambda r: r[3], reverse=True)
+    # Résultats OCR déjà lus, par position dans la sortie de recognize
+    read_results = {}
+    
+    def read(chunk):
+        """Lit un groupe de zones ; retourne (zone, bbox, texte, confiance) dans l'ordre du groupe"""
+        horizontal = [r[1] for r in chunk if r[0] == 'h']
+        free = [r[1] for r in chunk if r[0] == 'f']
+        start = time.perf_counter()
+        with pool.acquire(lang) as reader:
+            record_since(timings, 'reader_acquire_ms', start)
+            with timed(timings, 'ocr_recognition_ms'):
+                results = reader.recognize(img_cv_grey, horizontal, free, batch_size=len(chunk), reformat=False)
+        # recognize trie ses résultats par position verticale : on les rend à leur zone
+        by_region = {}
+        for bbox, text, confidence in results:
+            points = np.asarray(bbox, dtype=np.float64)
+            region_key = (points[0, 0], points[0, 1], points[2, 0], points[2, 1]) if len(points) == 4 else None
+            by_region.setdefault(tuple(points.ravel().tolist()), []).append((bbox, text, confidence))
+            if region_key is not None:
+                by_region.setdefault(region_key, []).append((bbox, text, confidence))
+        fragments = []
+        for region in chunk:
+            found = by_region.get(region[2])
+            if found:
+                bbox, text, confidence = found.pop(0)
+                read_results[region[4]] = rescale_results([(bbox, text, confidence)], scale)[0]
+                fragments.append((region, read_results[region[4]]))
+        return fragments
+    
+    def fill_cache():
+        """Lit les zones sautées puis met en cache l'OCR complet, comme run_ocr l'aurait fait"""
+        if cache is None:
+            return
+        unread = [region for region in regions if region[4] not in read_results]
+        if unread:
+            read(unread)
+        cache.put(key, [read_results[i] for i in sorted(read_results)])
+    
+    def matched(fragments):
+        """Correspondance d'un groupe : (zone, texte, nom, score, langue, confiance) des fragments avec lettres"""
+        rows = []
+        for region, (bbox, text, confidence) in fragments:
+            cleaned_text = ''.join([c for c in text if c.isalpha()])
+            if cleaned_text:
+                points = np.asarray(bbox, dtype=np.float64)
+                corner = points.min(axis=0)
+                rows.append((region, text, cleaned_text, float(confidence),
+                             [*corner.tolist(), *(points.max(axis=0) - corner).tolist()]))
+        with timed(timings, 'matching_ms'):
+            names, scores, langs = default_matcher.match_many([r[2] for r in rows], lang,
+                                                              score_cutoff=similarity_threshold)
+        return [(region, text, name, score, match_lang, (confidence, box))
+                for (region, text, _, confidence, box), name, score, match_lang
+                in zip(rows, names, scores.tolist(), langs)]
+    
+    def validated(name, score, read, match_lang):
+        confidence, box = read
+        return {'name': name, 'similarity': score, 'confidence': confidence, 'lang': match_lang, 'bbox': box}
+    
+    # Première passe : la première zone (par taille décroissante) dont le texte est un Pokémon
+    position, reference = 0, None
+    while position < len(regions) and reference is None:
+        for region, text, name, score, match_lang, read_info in matched(read(regions[position:position + 1])):
+            if verbose:
+                print(f"- Texte : {text} ➤ {name} (similitude : {score}%)")
+            if score > similarity_threshold:
+                reference = region
+                if verbose:
+                    print(f"  ✅ POKÉMON DE RÉFÉRENCE TROUVÉ : {name}")
+                if read_info[0] > 0.15:
+                    yield validated(name, score, read_info, match_lang)
+        position += 1
+    
+    if reference is None:
+        if verbose:
+            print("\n❌ Aucun Pokémon de référence trouvé.")
+        fill_cache()
+        return
+    
+    # Deuxième passe : les zones plus grandes ont déjà échoué au seuil, il ne reste
+    # que les plus petites, jusqu'à la borne basse de la plage de taille
+    size_min = reference[3] * (1 - size_tolerance)
+    remaining = []
+    for region in regions[position:]:
+        if region[3] < size_min:
+            break
+        remaining.append(region)
+    for chunk_start in range(0, len(remaining), STREAM_CHUNK):
+        for region, text, name, score, match_lang, read_info in matched(
+                read(remaining[chunk_start:chunk_start + STREAM_CHUNK])):
+            if verbose:
+                print(f"- Texte (taille compatible) : {text} ➤ {name} (similitude : {score}%)")
+            if score > similarity_threshold and read_info[0] > 0.15:
+                if verbose:
+                    print(f"  ✅ MATCH VALIDÉ")
+                yield validated(name, score, read_info, match_lang)
+    
+    # Après le dernier Pokémon : les zones hors de la plage de taille sont lues
+    # pour que le cache serve aussi les scans suivants (autres seuils, mode non flux)
+    fill_cache()
+
+def detect_pokemon_grid(image, lang='en', similarity_threshold=72, layout=None, verbose=False,
+                        grayscale=False, normalize_contrast=False, canvas_size=2560, mag_ratio=1.0,
+                        timings=None, max_side=None, use_cache=True):
+    """
+    Détecte les Pokémon d'une page de classeur, carte par carte
+    
+    La page est découpée en grille (3x3, 4x3 ou 2x2), puis seuls les bandeaux
+    de nom en haut de chaque carte sont lus par l'OCR, en un seul lot. Chaque
+    carte garde son meilleur nom, quelle que soit la taille de sa police.
+    
+    Args:
+        image: Chemin, array numpy RGB, image PIL ou bytes encodés
+        lang: Langue pour l'OCR ('en', 'fr', etc.)
+        similarity_threshold: Seuil de similitude minimum
+        layout: Disposition (lignes, colonnes) imposée, sinon estimée
+        verbose: Si True, affiche les détails du processus
+        grayscale, normalize_contrast, canvas_size, mag_ratio: Voir run_ocr (appliqués
+            aux bandeaux)
+        timings: Dict optionnel, complété avec la durée (ms) de chaque étape
+        max_side: Taille maximale du grand côté de la page avant découpage (None = taille d'origine)
+        use_cache: Si True, réutilise l'OCR des bandeaux déjà lus (voir read_name_bands)
+    
+    Returns:
+        Liste de dicts (name, similarity, confidence, lang, row, col, bbox, card_box)
+        ou None ; bbox = [x, y, largeur, hauteur] du nom lu et card_box =
+        (x, y, largeur, hauteur) de la carte, en coordonnées de la page
+    """
+    with timed(timings, 'decode_ms'):
+        bgr = cv2.imread(image) if isinstance(image, str) else load_image(image)
+    if bgr is None:
+        if verbose:
+            print("❌ Impossible de charger l'image")
+        return None
+    return _detect_pokemon_grid_bgr(bgr, lang, similarity_threshold, layout, verbose,
+                                    grayscale, normalize_contrast, canvas_size, mag_ratio, timings,
+                                    max_side=max_side, use_cache=use_cache)
+
+def read_name_bands(bgr, lang='en', layout=None, max_side=None, grayscale=False, normalize_contrast=False,
+                    canvas_size=2560, mag_ratio=1.0, use_cache=True, timings=None):
+    """
+    Découpe une page de classeur en cartes et lit leurs bandeaux de nom
+    
+    La sortie brute de readtext_batched est mise en cache bandeau par bandeau
+    (contenu du bandeau, taille commune du lot et réglages OCR) : relancer la
+    correspondance avec un autre seuil ne relit rien.
+    
+    Args:
+        bgr: Page BGR déjà décodée
+        Autres arguments : voir detect_pokemon_grid
+    
+    Returns:
+        Tuple (cartes, lectures) : cartes = dicts (row, col, box) en coordonnées de la
+        page ; lectures = pour chaque carte, liste de (bbox, texte, confiance) en
+        coordonnées de la page
+    """
+    cards = []
+    crops = []
+    with timed(timings, 'segmentation_ms'):
+        page, scale = prepare_image(bgr, max_side)
+        for card in segment_binder_page(page, layout):
+            crop, offset = name_band(page, card['box'])
+            if crop.shape[0] == 0 or crop.shape[1] == 0:
+                continue
+            cards.append((card, offset, crop))
+    if not cards:
+        return [], []
+    
+    # Tous les bandeaux à la même taille pour un seul lot OCR
+    band_w = int(np.median([c.shape[1] for _, _, c in cards]))
+    band_h = int(np.median([c.shape[0] for _, _, c in cards]))
+    
+    batched = [None] * len(cards)
+    keys = [None] * len(cards)
+    cache = get_ocr_cache() if use_cache else None
+    if cache is not None:
+        with timed(timings, 'cache_lookup_ms'):
+            backend = get_reader_pool().backend_name
+            for i, (_, _, crop) in enumerate(cards):
+                keys[i] = cache.make_key(crop, lang, backend, name_band=(band_w, band_h), grayscale=grayscale,
+                                         normalize_contrast=normalize_contrast, canvas_size=canvas_size,
+                                         mag_ratio=mag_ratio)
+                batched[i] = cache.get(keys[i])
+    pending = [i for i, results in enumerate(batched) if results is None]
+    
+    if pending:
+        with timed(timings, 'preprocess_ms'):
+            crops = [prepare_image(cards[i][2], None, grayscale, normalize_contrast)[0] for i in pending]
+        start = time.perf_counter()
+        with get_reader_pool().acquire(lang) as reader:
+            record_since(timings, 'reader_acquire_ms', start)
+            with timed(timings, 'ocr_ms'):
+                outputs = reader.readtext_batched(crops, n_width=band_w, n_height=band_h,
+                                                  canvas_size=canvas_size, mag_ratio=mag_ratio)
+        for i, results in zip(pending, outputs):
+            batched[i] = cache.put(keys[i], results) if cache is not None else results
+    
+    # Lectures repassées en coordonnées de la page d'origine
+    page_cards, readings = [], []
+    for (card, (ox, oy), crop), results in zip(cards, batched):
+        sx, sy = crop.shape[1] / band_w, crop.shape[0] / band_h
+        page_cards.append(dict(card, box=tuple(round(v / scale) for v in card['box'])))
+        readings.append([([[(bx * sx + ox) / scale, (by * sy + oy) / scale] for bx, by in bbox], text, confidence)
+                         for bbox, text, confidence in results])
+    return page_cards, readings
+
+def _detect_pokemon_grid_bgr(bgr, lang='en', similarity_threshold=72, layout=None, verbose=False,
+                             grayscale=False, normalize_contrast=False, canvas_size=2560, mag_ratio=1.0,
+                             timings=None, max_side=None, use_cache=True):
+    """Découpage en grille, OCR des bandeaux puis correspondance, sur une image BGR déjà décodée"""
+    cards, readings = read_name_bands(bgr, lang, layout, max_side, grayscale, normalize_contrast,
+                                      canvas_size, mag_ratio, use_cache, timings)
+    if not cards:
+        return None
+    
+    if verbose:
+        print(f"🗂️ {len(cards)} cartes trouvées sur la page")
+    
+    # Fragments de toutes les cartes
+    fragments = []
+    for card_index, results in enumerate(readings):
+        for page_bbox, text, confidence in results:
+            cleaned_text = ''.join([c for c in text if c.isalpha()])
+            if cleaned_text:
+                fragments.append((card_index, page_bbox, text, cleaned_text, confidence))
+    
+    with timed(timings, 'matching_ms'):
+        matches, scores, match_langs = default_matcher.match_many(
+            [f[3] for f in fragments], lang, score_cutoff=similarity_threshold)
+    
+    # Meilleur nom de chaque carte
+    best_by_card = {}
+    for fragment, match, score, match_lang in zip(fragments, matches, scores.tolist(), match_langs):
+        card_index, page_bbox, text, _, confidence = fragment
+        if verbose:
+            card = cards[card_index]
+            print(f"- Carte ({card['row'] + 1}, {card['col'] + 1}) : {text} ➤ {match} (similitude : {score}%)")
+        if score > similarity_threshold and confidence > 0.15:
+            if card_index not in best_by_card or score > best_by_card[card_index][1]:
+                best_by_card[card_index] = (match, score, confidence, match_lang, page_bbox)
+    
+    final_result = []
+    for card_index in sorted(best_by_card):
+        card = cards[card_index]
+        match, score, confidence, match_lang, page_bbox = best_by_card[card_index]
+        xs, ys = [x for x, _ in page_bbox], [y for _, y in page_bbox]
+        final_result.append({
+            'name': match,
+            'similarity': score,
+            'confidence': confidence,
+            'lang': match_lang,
+            'row': card['row'],
+            'col': card['col'],
+            # Zone du nom lu, comme pour detect_pokemon_name ; card_box = rectangle de la carte
+            'bbox': [float(min(xs)), float(min(ys)), float(max(xs) - min(xs)), float(max(ys) - min(ys))],
+            'card_box': list(card['box'])
+        })
+    
+    if verbose:
+        print(f"\n🎯 RÉSULTATS FINAUX : {len(final_result)} Pokémon(s) trouvé(s)")
+    
+    return final_result or None
+
 def detect_pokemon_name_best_match(image_path, lang='en', similarity_threshold=72, 
-                                  size_tolerance=0.3, return_best_only=True, verbose=False):
+                                  size_tolerance=0.3, return_best_only=True, verbose=False, timings=None,
+                                  **ocr_options):
     """
     Version optimisée qui retourne soit le meilleur match, soit tous les matches
     
@@ -167,7 +719,8 @@ def detect_pokemon_name_best_match(image_path, lang='en', similarity_threshold=7
     Returns:
         Soit un seul résultat (dict), soit une liste de résultats, soit None
     """
-    result = detect_pokemon_name(image_path, lang, similarity_threshold, size_tolerance, verbose)
+    result = detect_pokemon_name(image_path, lang, similarity_threshold, size_tolerance, verbose, timings,
+                                 **ocr_options)
     
     if result is None or len(result) == 0:
         return None
@@ -189,9 +742,9 @@ def detect_pokemon_simple(image_path, **kwargs):
         return [r['name'] for r in results]
     return None
 
-# Exemples d'utilisation
+# Exemples d'utilisation (benchmarks chiffrés : benchmarks/run_benchmarks.py)
 if __name__ == "__main__":
-    image_path = "g4.png"
+    image_path = "test_pokemon.png"
     
     print("--- Test standard ---")
     resultat = detect_pokemon_name(image_path, verbose=True)
@@ -0,0 +1,55 @@
+import cv2
+import numpy as np
+
+
+def prepare_image(image, max_side=None, grayscale=False, normalize_contrast=False):
+    """
+    Prépare une image BGR avant l'OCR
+
+    Args:
+        image: Image BGR (ou niveaux de gris)
+        max_side: Taille maximale du grand côté en pixels (None = taille d'origine)
+        grayscale: Si True, convertit en niveaux de gris
+        normalize_contrast: Si True, égalise le contraste local (CLAHE)
+
+    Returns:
+        Tuple (image préparée, échelle) ; échelle = taille préparée / taille d'origine
+    """
+    scale = 1.0
+    h, w = image.shape[:2]
+    if max_side and max(h, w) > max_side:
+        scale = max_side / max(h, w)
+        image = cv2.resize(image, (max(1, round(w * scale)), max(1, round(h * scale))),
+                           interpolation=cv2.INTER_AREA)
+
+    if grayscale and image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+    if normalize_contrast:
+        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+        if image.ndim == 2:
+            image = clahe.apply(image)
+        else:
+            # Égalisation sur la luminance seulement, les couleurs sont conservées
+            lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
+            lab[:, :, 0] = clahe.apply(lab[:, :, 0])
+            image = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
+
+    return image, scale
+
+
+def rescale_results(results, scale):
+    """
+    Ramène les bounding boxes EasyOCR dans les coordonnées de l'image d'origine
+
+    Args:
+        results: Liste de (bbox, texte, confiance)
+        scale: Échelle renvoyée par prepare_image
+    """
+    if scale == 1.0:
+        return results
+    rescaled = []
+    for bbox, text, confidence in results:
+        points = (np.asarray(bbox, dtype=np.float64) / scale).tolist()
+        rescaled.append((points, text, confidence))
+    return rescaled
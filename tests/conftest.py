@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modules du scanner à la racine du dépôt (comme pour benchmarks/)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,30 @@
+"""Dédoublonnage d'une photo : deux cartes distinctes ne sont jamais fusionnées"""
+import numpy as np
+
+from binder_grid import find_card_cells
+from collection import dedupe_detections
+
+
+def pikachu(x, y, confidence=0.9):
+    return {'name': 'Pikachu', 'similarity': 100.0, 'confidence': confidence, 'lang': 'en',
+            'bbox': [x, y, 120, 30]}
+
+
+def test_page_without_detected_cards_keeps_distinct_cards():
+    # Page uniforme : aucun contour de carte, pas de case « toute l'image »
+    page = np.full((1500, 2000, 3), 200, np.uint8)
+    cards = find_card_cells(page)
+    assert cards == []
+
+    detections = [pikachu(100, 100), pikachu(1100, 100, confidence=0.8)]
+    assert len(dedupe_detections(detections, cards)) == 2
+
+
+def test_single_card_photo_is_one_cell():
+    card = np.full((880, 630, 3), 200, np.uint8)
+    cards = find_card_cells(card)
+    assert [(c['row'], c['col']) for c in cards] == [(0, 0)]
+
+    # Le nom et la ligne d'évolution d'une même carte : un seul exemplaire
+    kept = dedupe_detections([pikachu(50, 40), pikachu(300, 500, confidence=0.5)], cards)
+    assert [d['confidence'] for d in kept] == [0.9]
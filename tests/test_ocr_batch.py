@@ -0,0 +1,70 @@
+"""Lecture par lots : une image donne le même résultat seule ou avec d'autres"""
+import asyncio
+
+import numpy as np
+
+import ocr_reader
+from ocr_scheduler import OCRScheduler
+from pokemon_detector import run_ocr, run_ocr_batch
+
+
+class ScaleSensitiveReader:
+    """
+    Reader au format EasyOCR dont la détection dépend de l'échelle, comme CRAFT :
+    le lot est redimensionné d'après sa plus grande image (resize_aspect_ratio)
+    """
+
+    def __init__(self):
+        self.detect_calls = 0
+
+    def detect(self, img, canvas_size=2560, mag_ratio=1.0, reformat=True):
+        self.detect_calls += 1
+        images = img if img.ndim == 4 else img[np.newaxis]
+        longest = max(images.shape[1:3])
+        ratio = min(mag_ratio * longest, canvas_size) / longest
+        # Une boîte plus large quand l'image est lue à pleine résolution
+        return [[[5, 5 + round(40 * ratio), 5, 15]] for _ in images], [[] for _ in images]
+
+    def recognize(self, img_cv_grey, horizontal_list, free_list, batch_size=1, reformat=True):
+        return [([[x_min, y_min], [x_max, y_min], [x_max, y_max], [x_min, y_max]], f"w{x_max - x_min}", 0.9)
+                for x_min, x_max, y_min, y_max in horizontal_list]
+
+
+def use_reader(monkeypatch):
+    reader = ScaleSensitiveReader()
+    pool = ocr_reader.ReaderPool(reader_factory=lambda langs, gpu: reader, backend='torch')
+    monkeypatch.setattr(ocr_reader, '_default_pool', pool)
+    return reader
+
+
+def images():
+    rng = np.random.default_rng(0)
+    small = rng.integers(0, 255, (60, 80, 3), np.uint8)
+    large = rng.integers(0, 255, (150, 200, 3), np.uint8)
+    other_small = rng.integers(0, 255, (60, 80, 3), np.uint8)
+    return [small, large, other_small]
+
+
+def test_batched_results_match_single_image_ocr(monkeypatch):
+    reader = use_reader(monkeypatch)
+    batch = images()
+    alone = [run_ocr(image, canvas_size=100, use_cache=False) for image in batch]
+    assert alone[0] != alone[1]
+
+    reader.detect_calls = 0
+    assert run_ocr_batch(batch, canvas_size=100, use_cache=False) == alone
+    # Les deux petites images partagent un passage du détecteur, la grande est lue à part
+    assert reader.detect_calls == 2
+
+
+def test_scheduler_batches_only_same_size_images(monkeypatch):
+    use_reader(monkeypatch)
+    batch = images()
+    alone = [run_ocr(image, canvas_size=100, use_cache=False) for image in batch]
+
+    async def submit_all():
+        scheduler = OCRScheduler(max_batch=8, window_ms=20, workers=1)
+        return await asyncio.gather(*(scheduler.submit(image, 'en', canvas_size=100, use_cache=False)
+                                      for image in batch))
+
+    assert asyncio.run(submit_all()) == alone
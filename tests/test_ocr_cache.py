@@ -0,0 +1,54 @@
+"""Cache OCR : une lecture d'un moteur n'est jamais resservie à un autre moteur"""
+import numpy as np
+
+import ocr_cache
+import ocr_reader
+from pokemon_detector import run_ocr
+
+
+class FakeReader:
+    """Reader au format EasyOCR : une zone de texte, lue différemment selon le moteur"""
+
+    def __init__(self, text):
+        self.text = text
+        self.calls = 0
+
+    def detect(self, img, canvas_size=2560, mag_ratio=1.0, reformat=True):
+        return [[[10, 90, 10, 30]]], [[]]
+
+    def recognize(self, img_cv_grey, horizontal_list, free_list, batch_size=1, reformat=True):
+        self.calls += 1
+        return [([[x_min, y_min], [x_max, y_min], [x_max, y_max], [x_min, y_max]], self.text, 0.9)
+                for x_min, x_max, y_min, y_max in horizontal_list]
+
+
+def use_backend(monkeypatch, backend, reader):
+    pool = ocr_reader.ReaderPool(reader_factory=lambda langs, gpu: reader, backend=backend)
+    monkeypatch.setattr(ocr_reader, '_default_pool', pool)
+
+
+def test_backends_do_not_share_cache_entries(tmp_path, monkeypatch):
+    # Cache persistant : il survit au changement de SCANNER_OCR_BACKEND
+    monkeypatch.setattr(ocr_cache, '_default_cache', ocr_cache.OCRCache(path=str(tmp_path / 'ocr.sqlite')))
+    image = np.full((40, 100, 3), 255, np.uint8)
+
+    torch_reader, onnx_reader = FakeReader('Pikachu'), FakeReader('Pikachv')
+    use_backend(monkeypatch, 'torch', torch_reader)
+    assert run_ocr(image)[0][1] == 'Pikachu'
+    assert run_ocr(image)[0][1] == 'Pikachu'
+    assert torch_reader.calls == 1
+
+    use_backend(monkeypatch, 'onnx-int8', onnx_reader)
+    assert run_ocr(image)[0][1] == 'Pikachv'
+    assert onnx_reader.calls == 1
+
+    use_backend(monkeypatch, 'torch', torch_reader)
+    assert run_ocr(image)[0][1] == 'Pikachu'
+    assert torch_reader.calls == 1
+
+
+def test_cache_key_includes_backend():
+    image = np.zeros((8, 8, 3), np.uint8)
+    keys = {ocr_cache.OCRCache.make_key(image, 'en', backend, max_side=None)
+            for backend in ('torch', 'onnx', 'onnx-int8')}
+    assert len(keys) == 3
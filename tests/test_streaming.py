@@ -0,0 +1,64 @@
+"""Scan en flux : mêmes résultats que detect_pokemon_name, et le cache OCR est rempli"""
+import numpy as np
+
+import ocr_cache
+import ocr_reader
+from pokemon_detector import detect_pokemon_name, iter_pokemon_names, run_ocr
+
+# Zones horizontales (x_min, x_max, y_min, y_max) et leur texte, de tailles variées
+ZONES = [
+    ([20, 220, 10, 50], 'Pikachu'),
+    ([20, 120, 80, 100], 'HP 60'),
+    ([240, 420, 20, 55], 'Raichu'),
+    ([30, 60, 200, 210], 'Mew'),
+]
+
+
+class FakeReader:
+    """Reader au format EasyOCR : lit le texte de chaque zone connue, dans l'ordre des zones"""
+
+    def __init__(self):
+        self.detect_calls = 0
+        self.recognized = 0
+
+    def detect(self, img, canvas_size=2560, mag_ratio=1.0, reformat=True):
+        self.detect_calls += 1
+        return [[box for box, _ in ZONES]], [[]]
+
+    def recognize(self, img_cv_grey, horizontal_list, free_list, batch_size=1, reformat=True):
+        texts = {tuple(box): text for box, text in ZONES}
+        self.recognized += len(horizontal_list)
+        return [([[x_min, y_min], [x_max, y_min], [x_max, y_max], [x_min, y_max]],
+                 texts[(x_min, x_max, y_min, y_max)], 0.9)
+                for x_min, x_max, y_min, y_max in horizontal_list]
+
+
+def use_reader(monkeypatch, reader):
+    pool = ocr_reader.ReaderPool(reader_factory=lambda langs, gpu: reader)
+    monkeypatch.setattr(ocr_reader, '_default_pool', pool)
+    monkeypatch.setattr(ocr_cache, '_default_cache', ocr_cache.OCRCache())
+
+
+def test_stream_fills_ocr_cache(monkeypatch):
+    image = np.full((240, 480, 3), 255, np.uint8)
+    reader = FakeReader()
+    use_reader(monkeypatch, reader)
+
+    # Seule la première passe lit toutes les zones : la petite « Mew » est hors plage
+    first = list(iter_pokemon_names(image, size_tolerance=0.3))
+    assert [r['name'] for r in first] == ['Pikachu', 'Raichu']
+    assert reader.detect_calls == 1
+    assert reader.recognized == len(ZONES)
+
+    # Rescans avec d'autres réglages, en flux ou non : servis par le cache
+    for tolerance in (0.3, 0.99):
+        streamed = list(iter_pokemon_names(image, size_tolerance=tolerance))
+        assert streamed == detect_pokemon_name(image, size_tolerance=tolerance)
+    assert 'Mew' in [r['name'] for r in streamed]
+    assert reader.detect_calls == 1
+    assert ocr_cache.get_ocr_cache().stats()['hits'] == 4
+
+    # L'entrée est celle qu'aurait écrite run_ocr
+    cached = run_ocr(image)
+    use_reader(monkeypatch, FakeReader())
+    assert run_ocr(image) == cached
@@ -0,0 +1,132 @@
+"""
+Scan vidéo hors ligne : feuilletage d'un classeur synthétique (cartes du jeu de benchmarks)
+
+L'OCR est remplacé par une lecture « parfaite » de la page filmée : le test
+vérifie le tri des images (doublons, mouvement, pages connues), pas EasyOCR.
+"""
+import glob
+import os
+import random
+
+import cv2
+import numpy as np
+import pytest
+
+import video_scanner
+
+CARDS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fixtures', 'cards')
+CARD_W, CARD_H, GAP = 150, 210, 10
+BACKGROUND = 40
+
+
+def load_cards():
+    paths = sorted(glob.glob(os.path.join(CARDS_DIR, '*.jpg')))
+    return [(os.path.splitext(os.path.basename(p))[0], cv2.resize(cv2.imread(p), (CARD_W, CARD_H))) for p in paths]
+
+
+def binder_layouts(n_cards, n_pages=12, seed=0):
+    """Pages 3x3 qui partagent plusieurs pochettes : des empreintes dHash proches"""
+    rng = random.Random(seed)
+    base = [rng.randrange(n_cards) for _ in range(9)]
+    layouts = []
+    while len(layouts) < n_pages:
+        layout = list(base)
+        for i in rng.sample(range(9), 5):
+            layout[i] = rng.randrange(n_cards)
+        if layout not in layouts:
+            layouts.append(layout)
+    return layouts
+
+
+def render_page(layout, cards):
+    page = np.full((3 * (CARD_H + GAP) + GAP, 3 * (CARD_W + GAP) + GAP, 3), BACKGROUND, np.uint8)
+    for i, card in enumerate(layout):
+        row, col = divmod(i, 3)
+        y, x = GAP + row * (CARD_H + GAP), GAP + col * (CARD_W + GAP)
+        page[y:y + CARD_H, x:x + CARD_W] = cards[card][1]
+    return page
+
+
+def shifted(frame, dx):
+    matrix = np.float32([[1, 0, dx], [0, 1, 0]])
+    return cv2.warpAffine(frame, matrix, (frame.shape[1], frame.shape[0]), borderValue=(BACKGROUND,) * 3)
+
+
+def write_flip_video(path, pages, order, still_frames=6):
+    """Chaque page tourne (images décalées, en mouvement) puis reste immobile quelques images"""
+    height, width = pages[0].shape[:2]
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 10, (width, height))
+    assert writer.isOpened()
+    for index in order:
+        for dx in (-240, -160, -80):
+            writer.write(shifted(pages[index], dx))
+        for _ in range(still_frames):
+            writer.write(pages[index])
+    writer.release()
+
+
+@pytest.fixture
+def binder(tmp_path, monkeypatch):
+    cards = load_cards()
+    layouts = binder_layouts(len(cards))
+    pages = [render_page(layout, cards) for layout in layouts]
+    thumbnails = [cv2.resize(p, (64, 64), interpolation=cv2.INTER_AREA).astype(np.int16) for p in pages]
+    ocr_calls = []
+
+    def fake_grid_scan(frame, lang, similarity_threshold, timings=None, **ocr_options):
+        # Page filmée = page de référence la plus proche
+        small = cv2.resize(frame, (64, 64), interpolation=cv2.INTER_AREA).astype(np.int16)
+        index = int(np.argmin([np.abs(small - t).mean() for t in thumbnails]))
+        ocr_calls.append(index)
+        return [{'name': cards[card][0], 'similarity': 100.0, 'confidence': 0.9, 'lang': lang,
+                 'row': i // 3, 'col': i % 3} for i, card in enumerate(layouts[index])]
+
+    monkeypatch.setattr(video_scanner, '_detect_pokemon_grid_bgr', fake_grid_scan)
+    return cards, layouts, pages, ocr_calls, tmp_path
+
+
+def scan(path):
+    records = video_scanner.scan_video(path, grid_mode=True)
+    output = []
+    while True:
+        try:
+            output.append(next(records))
+        except StopIteration as stop:
+            return output, stop.value
+
+
+def test_similar_binder_pages_are_all_read(binder):
+    cards, layouts, pages, ocr_calls, tmp_path = binder
+    # Des pages distinctes sont sous l'ancien seuil de 0,2 : l'empreinte seule ne suffit pas
+    hashes = [video_scanner.dhash(p) for p in pages]
+    closest = min(video_scanner.hash_distance(a, b) for i, a in enumerate(hashes) for b in hashes[i + 1:])
+    assert closest < 0.2
+
+    path = str(tmp_path / 'flip.avi')
+    write_flip_video(path, pages, range(len(pages)))
+    records, stats = scan(path)
+
+    assert sorted(set(ocr_calls)) == list(range(len(pages)))
+    assert stats['pages'] == len(pages)
+    last = {}
+    for record in records:
+        last[record['page']] = record
+    for page_index, layout in enumerate(layouts):
+        found = {(p['row'], p['col']): p['name'] for p in last[page_index]['pokemon']}
+        assert found == {divmod(i, 3): cards[card][0] for i, card in enumerate(layout)}
+
+
+def test_each_page_is_read_once_and_revisits_merge(binder):
+    cards, layouts, pages, ocr_calls, tmp_path = binder
+    path = str(tmp_path / 'revisit.avi')
+    # Aller-retour sur les pages 2-3, puis retour à la page 0 bien plus tard
+    order = [0, 1, 2, 3, 2, 3, 4, 5, 0]
+    write_flip_video(path, pages, order, still_frames=10)
+    records, stats = scan(path)
+
+    assert stats['pages'] == 6
+    # Pages récentes reconnues à l'empreinte ; la page 0, revue plus tard, est relue puis rattachée
+    assert ocr_calls.count(2) == 1 and ocr_calls.count(3) == 1
+    assert ocr_calls.count(0) == 2
+    assert records[-1]['page'] == 0 and not records[-1]['new_page'] and records[-1]['added'] == []
+    assert stats['ocr'] < stats['frames'] // 10
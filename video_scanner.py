@@ -0,0 +1,336 @@
+"""
+Scan de classeur en vidéo : pages tournées devant une caméra ou vidéo enregistrée
+
+Lancer l'OCR sur chaque image d'une vidéo est bien trop lent. Ici, seules les
+images utiles sont lues :
+- image quasi identique à la dernière image traitée (empreinte dHash) : sautée
+- caméra en mouvement (page en train de tourner) : sautée tant que l'image n'est
+  pas stable sur quelques images consécutives
+- image floue (variance du Laplacien trop faible) : sautée
+- page qu'on vient de lire (empreinte très proche de la page courante ou d'une
+  des précédentes) : sautée
+
+Deux pages différentes d'un classeur peuvent avoir des empreintes proches
+(mêmes cartes dans certaines pochettes) : l'empreinte n'est donc comparée
+qu'aux dernières pages vues, avec un seuil strict. Une lecture n'est rattachée
+à une page connue (même page recadrée, ou page revue plus tard) que si ses
+noms concordent, case par case en mode classeur.
+
+Usage :
+    python video_scanner.py classeur.mp4 -o pages.jsonl --grid
+    python video_scanner.py 0 --grid          # webcam n°0
+"""
+import argparse
+import json
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from pokemon_detector import _detect_pokemon_name_bgr, _detect_pokemon_grid_bgr
+
+# Côté de l'empreinte dHash (HASH_SIZE² bits)
+HASH_SIZE = 16
+
+
+def dhash(frame, hash_size=HASH_SIZE):
+    """
+    Empreinte perceptuelle (dHash) d'une image BGR ou en niveaux de gris
+
+    L'image est réduite à (hash_size + 1) x hash_size ; chaque bit indique si un
+    pixel est plus clair que son voisin de droite.
+
+    Returns:
+        Array booléen de hash_size² bits
+    """
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    return (small[:, 1:] > small[:, :-1]).ravel()
+
+
+def hash_distance(a, b):
+    """Proportion de bits différents entre deux empreintes (0 = identiques)"""
+    return np.count_nonzero(a != b) / a.size
+
+
+def sharpness(frame, max_side=640):
+    """
+    Netteté d'une image : variance du Laplacien, calculée sur une copie réduite
+
+    La réduction rend le score comparable d'une résolution de caméra à l'autre.
+    """
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    h, w = gray.shape[:2]
+    scale = min(1.0, max_side / max(h, w))
+    if scale < 1:
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return float(cv2.Laplacian(gray, cv2.CV_64F).var())
+
+
+def iter_frames(source, frame_step=1):
+    """
+    Lit les images d'une vidéo ou d'une caméra
+
+    Args:
+        source: Chemin de vidéo, URL de flux ou numéro de caméra (int ou chaîne de chiffres)
+        frame_step: Ne décode qu'une image sur frame_step (les autres sont seulement sautées)
+
+    Yields:
+        Tuples (numéro d'image, position en ms, image BGR)
+    """
+    if isinstance(source, str) and source.isdigit():
+        source = int(source)
+    capture = cv2.VideoCapture(source)
+    if not capture.isOpened():
+        raise IOError(f"Impossible d'ouvrir la source vidéo : {source}")
+    try:
+        index = 0
+        while True:
+            if index % frame_step:
+                # grab() sans retrieve() : l'image n'est pas décodée
+                if not capture.grab():
+                    break
+            else:
+                ok, frame = capture.read()
+                if not ok:
+                    break
+                yield index, capture.get(cv2.CAP_PROP_POS_MSEC), frame
+            index += 1
+    finally:
+        capture.release()
+
+
+class VideoScanner:
+    """
+    Suivi des pages d'un classeur au fil des images d'une vidéo
+
+    Les images sont passées une à une à process() ; seules celles qui montrent
+    une nouvelle page, stable et nette, passent par l'OCR.
+
+    Args:
+        lang, similarity_threshold, size_tolerance: Voir detect_pokemon_name
+        grid_mode: Si True, analyse carte par carte (detect_pokemon_grid)
+        duplicate_distance: Distance d'empreinte sous laquelle une image est un doublon
+            de la dernière image traitée
+        stable_distance: Distance maximale entre deux images consécutives pour
+            considérer la caméra immobile
+        settle_frames: Images stables consécutives requises avant l'OCR
+        page_distance: Distance sous laquelle une image montre une des dernières pages vues
+        recent_pages: Nombre de pages récentes comparées par empreinte
+        min_sharpness: Netteté minimale (variance du Laplacien, voir sharpness)
+        name_overlap: Concordance minimale (Jaccard des noms, ou des couples case/nom en
+            mode classeur) pour rattacher une lecture à une page connue
+        **ocr_options: Prétraitement et réglages EasyOCR (voir run_ocr)
+    """
+
+    def __init__(self, lang='en', similarity_threshold=72, size_tolerance=0.3, grid_mode=False,
+                 duplicate_distance=0.05, stable_distance=0.1, settle_frames=2, page_distance=0.1,
+                 recent_pages=2, min_sharpness=60.0, name_overlap=0.75, **ocr_options):
+        self.lang = lang
+        self.similarity_threshold = similarity_threshold
+        self.size_tolerance = size_tolerance
+        self.grid_mode = grid_mode
+        self.duplicate_distance = duplicate_distance
+        self.stable_distance = stable_distance
+        self.settle_frames = settle_frames
+        self.page_distance = page_distance
+        self.recent_pages = recent_pages
+        self.min_sharpness = min_sharpness
+        self.name_overlap = name_overlap
+        self.ocr_options = ocr_options
+        # Pages lues : empreintes vues et meilleur résultat par nom (ou par case en mode classeur)
+        self.pages = []
+        self.stats = {'frames': 0, 'moving': 0, 'duplicate': 0, 'known_page': 0, 'blurry': 0, 'ocr': 0}
+        self._previous_hash = None
+        self._processed_hash = None
+        self._stable_count = 0
+        # Numéros des dernières pages vues, la plus récente en premier
+        self._recent = []
+
+    def _key(self, result):
+        return (result['row'], result['col']) if self.grid_mode else result['name']
+
+    def _find_page(self, frame_hash):
+        for index in self._recent:
+            page = self.pages[index]
+            if any(hash_distance(frame_hash, h) <= self.page_distance for h in page['hashes']):
+                return page
+        return None
+
+    def _seen(self, page):
+        if page['index'] in self._recent:
+            self._recent.remove(page['index'])
+        self._recent.insert(0, page['index'])
+        del self._recent[self.recent_pages:]
+
+    def _page_by_names(self, results):
+        # Noms seuls, ou couples (case, nom) en mode classeur : une carte d'une autre page
+        # rangée dans la même pochette ne suffit pas à rattacher la lecture
+        read = {(self._key(r), r['name']) for r in results}
+        if not read:
+            return None
+        best, best_overlap = None, 0.0
+        for page in self.pages:
+            known = {(key, p['name']) for key, p in page['pokemon'].items()}
+            overlap = len(read & known) / len(read | known)
+            if overlap > best_overlap:
+                best, best_overlap = page, overlap
+        return best if best_overlap >= self.name_overlap else None
+
+    def _scan(self, frame, timings):
+        if self.grid_mode:
+            return _detect_pokemon_grid_bgr(frame, self.lang, self.similarity_threshold, timings=timings,
+                                            **self.ocr_options) or []
+        return _detect_pokemon_name_bgr(frame, self.lang, self.similarity_threshold, self.size_tolerance, False,
+                                        timings, self.ocr_options) or []
+
+    def process(self, frame, index=None, time_ms=None):
+        """
+        Traite une image BGR de la vidéo
+
+        Returns:
+            None si l'image est sautée, sinon un dict : page (numéro), new_page,
+            frame, time_ms, sharpness, pokemon (tous les Pokémon de la page),
+            added (noms ajoutés par cette image) et timings (ms par étape)
+        """
+        self.stats['frames'] += 1
+        frame_hash = dhash(frame)
+
+        # Caméra en mouvement : on attend que l'image se stabilise
+        if self._previous_hash is not None and hash_distance(frame_hash, self._previous_hash) <= self.stable_distance:
+            self._stable_count += 1
+        else:
+            self._stable_count = 0
+        self._previous_hash = frame_hash
+        if self._stable_count < self.settle_frames:
+            self.stats['moving'] += 1
+            return None
+
+        if self._processed_hash is not None and hash_distance(frame_hash, self._processed_hash) <= self.duplicate_distance:
+            self.stats['duplicate'] += 1
+            return None
+
+        page = self._find_page(frame_hash)
+        if page is not None:
+            # Les images suivantes de cette page deviennent de simples doublons
+            self._processed_hash = frame_hash
+            self._seen(page)
+            self.stats['known_page'] += 1
+            return None
+
+        score = sharpness(frame)
+        if score < self.min_sharpness:
+            self.stats['blurry'] += 1
+            return None
+
+        timings = {}
+        start = time.perf_counter()
+        results = self._scan(frame, timings)
+        timings['scan_ms'] = (time.perf_counter() - start) * 1000
+        self.stats['ocr'] += 1
+        self._processed_hash = frame_hash
+
+        # Même page recadrée (empreinte différente, mêmes noms) : résultats fusionnés
+        page = self._page_by_names(results)
+        new_page = page is None
+        if new_page:
+            page = {'index': len(self.pages), 'hashes': [], 'pokemon': {}}
+            self.pages.append(page)
+        page['hashes'].append(frame_hash)
+        self._seen(page)
+
+        added = []
+        for result in results:
+            key = self._key(result)
+            best = page['pokemon'].get(key)
+            if best is None or result['confidence'] > best['confidence']:
+                if best is None or best['name'] != result['name']:
+                    added.append(result['name'])
+                page['pokemon'][key] = result
+
+        return {
+            'page': page['index'],
+            'new_page': new_page,
+            'frame': index,
+            'time_ms': time_ms,
+            'sharpness': score,
+            'pokemon': list(page['pokemon'].values()),
+            'added': added,
+            'timings': timings,
+        }
+
+
+def scan_video(source, frame_step=1, **scanner_options):
+    """
+    Scanne une vidéo ou une caméra page par page
+
+    Args:
+        source: Voir iter_frames
+        frame_step: Voir iter_frames
+        **scanner_options: Voir VideoScanner
+
+    Yields:
+        Un dict par image lue par l'OCR (voir VideoScanner.process) ; la dernière
+        entrée d'une page contient tous ses Pokémon
+
+    Returns:
+        Compteurs d'images (lues, sautées par motif, passées à l'OCR) et nombre de pages
+    """
+    scanner = VideoScanner(**scanner_options)
+    for index, time_ms, frame in iter_frames(source, frame_step):
+        record = scanner.process(frame, index, time_ms)
+        if record is not None:
+            yield record
+    return dict(scanner.stats, pages=len(scanner.pages))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scan de classeur Pokémon en vidéo (fichier ou caméra)")
+    parser.add_argument('source', help='Fichier vidéo, URL de flux ou numéro de caméra')
+    parser.add_argument('-o', '--output', default='-', help='Fichier JSONL de sortie (- = stdout)')
+    parser.add_argument('--lang', default='en')
+    parser.add_argument('--threshold', type=float, default=72)
+    parser.add_argument('--size-tolerance', type=float, default=0.3)
+    parser.add_argument('--grid', action='store_true', help='Mode classeur (analyse carte par carte)')
+    parser.add_argument('--frame-step', type=int, default=1, help='Ne décode qu\'une image sur N')
+    parser.add_argument('--min-sharpness', type=float, default=60.0)
+    parser.add_argument('--settle-frames', type=int, default=2)
+    parser.add_argument('--max-side', type=int, default=None)
+    parser.add_argument('--grayscale', action='store_true')
+    parser.add_argument('--normalize-contrast', action='store_true')
+    args = parser.parse_args(argv)
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    start = time.perf_counter()
+    records = scan_video(
+        args.source, frame_step=args.frame_step, lang=args.lang, similarity_threshold=args.threshold,
+        size_tolerance=args.size_tolerance, grid_mode=args.grid, min_sharpness=args.min_sharpness,
+        settle_frames=args.settle_frames, max_side=args.max_side, grayscale=args.grayscale,
+        normalize_contrast=args.normalize_contrast,
+    )
+    stats = None
+    try:
+        while True:
+            try:
+                record = next(records)
+            except StopIteration as stop:
+                stats = stop.value
+                break
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            out.flush()
+            if record['added']:
+                print(f"📖 Page {record['page'] + 1} : {', '.join(record['added'])}", file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    if stats:
+        elapsed = time.perf_counter() - start
+        skipped = stats['moving'] + stats['duplicate'] + stats['known_page'] + stats['blurry']
+        print(f"✅ {stats['pages']} page(s), {stats['ocr']} OCR pour {stats['frames']} image(s) "
+              f"({skipped} sautées) en {elapsed:.1f} s", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
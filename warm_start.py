@@ -0,0 +1,141 @@
+"""
+Démarrage rapide du serveur : l'application est construite en arrière-plan
+
+Importer gradio, torch et EasyOCR puis charger les Readers prend plusieurs
+secondes. WarmStartApp est une petite application ASGI servie tout de suite
+par uvicorn : elle répond à /healthz pendant qu'un thread construit la vraie
+application (FastAPI + Gradio) et précharge les modèles, puis lui transmet
+toutes les requêtes.
+
+    uvicorn.run(WarmStartApp(create_server, warmup=precharger_modeles), ...)
+"""
+import asyncio
+import json
+import threading
+import time
+
+
+class WarmStartApp:
+    """
+    Application ASGI qui répond pendant la construction de l'application réelle
+
+    États exposés sur /healthz : 'starting' (construction de l'application),
+    'warming' (application servie, modèles en cours de chargement), 'ready'
+    (code 200) et 'failed'. Avant 'warming', les autres requêtes reçoivent
+    un 503 avec Retry-After.
+
+    Args:
+        build: Fonction sans argument renvoyant l'application ASGI réelle
+        warmup: Fonction optionnelle exécutée ensuite (chargement des modèles)
+        health_path: Chemin de la sonde de santé
+    """
+
+    def __init__(self, build, warmup=None, health_path='/healthz'):
+        self.build = build
+        self.warmup = warmup
+        self.health_path = health_path
+        self.status = 'starting'
+        self.error = None
+        self.started = time.perf_counter()
+        self.timings = {}
+        self._app = None
+        self._loop = None
+        self._lifespan_queue = None
+        self._lifespan_task = None
+        self._lifespan_state = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http' and scope['path'] == self.health_path:
+            await self._health(send)
+        elif self._app is not None:
+            # État partagé posé par le cycle de vie de l'application réelle
+            scope = dict(scope, state={**self._lifespan_state, **scope.get('state', {})})
+            await self._app(scope, receive, send)
+        elif scope['type'] == 'http':
+            await _send_json(send, 503, {'status': self.status, 'detail': "Démarrage en cours"},
+                             [(b'retry-after', b'2')])
+        elif scope['type'] == 'websocket':
+            await send({'type': 'websocket.close', 'code': 1013})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self._loop = asyncio.get_running_loop()
+                threading.Thread(target=self._start, name='warm-start', daemon=True).start()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self._lifespan_task is not None:
+                    await self._lifespan_queue.put({'type': 'lifespan.shutdown'})
+                    await self._lifespan_task
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def _start(self):
+        """Thread de démarrage : construction de l'application, puis préchargement"""
+        try:
+            start = time.perf_counter()
+            app = self.build()
+            self.timings['build_s'] = time.perf_counter() - start
+            # Le cycle de vie de l'application réelle (tâches de fond Gradio) tourne dans la boucle du serveur
+            asyncio.run_coroutine_threadsafe(self._start_app(app), self._loop).result()
+            self.status = 'warming'
+            if self.warmup is not None:
+                start = time.perf_counter()
+                self.warmup()
+                self.timings['warmup_s'] = time.perf_counter() - start
+            self.status = 'ready'
+        except Exception as e:
+            self.status = 'failed'
+            self.error = f"{type(e).__name__}: {e}"
+            print(f"❌ Échec du démarrage : {self.error}")
+
+    async def _start_app(self, app):
+        """Envoie à l'application réelle l'événement de démarrage que uvicorn nous a déjà transmis"""
+        self._lifespan_queue = asyncio.Queue()
+        started = self._loop.create_future()
+
+        async def send(message):
+            if started.done():
+                return
+            if message['type'] == 'lifespan.startup.complete':
+                started.set_result(None)
+            elif message['type'] == 'lifespan.startup.failed':
+                started.set_exception(RuntimeError(message.get('message', 'lifespan.startup.failed')))
+
+        def finished(task):
+            # Cycle de vie terminé (ou en erreur) avant la fin du démarrage
+            if not started.done():
+                error = None if task.cancelled() else task.exception()
+                started.set_exception(error or RuntimeError("Cycle de vie de l'application interrompu"))
+
+        await self._lifespan_queue.put({'type': 'lifespan.startup'})
+        scope = {'type': 'lifespan', 'asgi': {'version': '3.0', 'spec_version': '2.0'},
+                 'state': self._lifespan_state}
+        self._lifespan_task = asyncio.ensure_future(app(scope, self._lifespan_queue.get, send))
+        self._lifespan_task.add_done_callback(finished)
+        await started
+        self._app = app
+
+    async def _health(self, send):
+        payload = {
+            'status': self.status,
+            'uptime_s': round(time.perf_counter() - self.started, 3),
+            **{k: round(v, 3) for k, v in self.timings.items()},
+        }
+        if self.error:
+            payload['error'] = self.error
+        await _send_json(send, 200 if self.status == 'ready' else 503, payload)
+
+
+async def _send_json(send, status, payload, headers=()):
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode()),
+                    *headers],
+    })
+    await send({'type': 'http.response.body', 'body': body})
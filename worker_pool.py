@@ -0,0 +1,200 @@
+"""
+Pool de processus de scan pour les machines sans GPU
+
+Un seul processus n'occupe qu'une partie des cœurs : la détection EasyOCR
+est limitée par les threads torch, et les boucles Python de correspondance
+par le GIL. Ici, chaque worker (processus lancé en « spawn ») possède son
+propre Reader préchargé et un nombre fixe de threads torch, pour que les
+workers ne se disputent pas les cœurs. Les images décodées passent par la
+mémoire partagée (multiprocessing.shared_memory) au lieu d'être sérialisées.
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from ocr_scheduler import SchedulerBusy
+
+
+def _init_worker(threads, warmup_langs, reader_factory):
+    """Initialisation d'un worker : threads torch/OpenCV/correspondance, Reader dédié et préchargé"""
+    # Avant l'import de torch, pour les bibliothèques OpenMP/MKL
+    os.environ['OMP_NUM_THREADS'] = str(threads)
+    os.environ['MKL_NUM_THREADS'] = str(threads)
+    # Sessions ONNX Runtime (SCANNER_OCR_BACKEND=onnx)
+    os.environ.setdefault('SCANNER_ONNX_THREADS', str(threads))
+    import cv2
+    import torch
+    torch.set_num_threads(threads)
+    cv2.setNumThreads(1)
+    # Correspondance (rapidfuzz cdist) : mêmes threads que torch, sans déborder sur les autres workers
+    from pokedex_matcher import default_matcher
+    default_matcher.workers = threads
+
+    import ocr_reader
+    max_mb = os.environ.get('SCANNER_READER_MAX_MB')
+    # Un seul Reader par langue et par worker : le parallélisme vient des processus
+    ocr_reader._default_pool = ocr_reader.ReaderPool(
+        max_memory_mb=float(max_mb) if max_mb else None, replicas=1, reader_factory=reader_factory)
+    if warmup_langs:
+        ocr_reader._default_pool.warmup(warmup_langs)
+
+
+def _attach(name):
+    try:
+        # Python 3.13+ : le processus parent reste seul responsable du segment
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+def _scan_task(ref, lang, similarity_threshold, size_tolerance, grid_mode, ocr_options):
+    """Scan exécuté dans un worker sur une image en mémoire partagée"""
+    from pokemon_detector import _detect_pokemon_name_bgr, _detect_pokemon_grid_bgr
+
+    name, shape, dtype = ref
+    start = time.perf_counter()
+    timings = {}
+    shm = _attach(name)
+    image = None
+    try:
+        image = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        if grid_mode:
+            results = _detect_pokemon_grid_bgr(image, lang, similarity_threshold, timings=timings, **ocr_options)
+        else:
+            results = _detect_pokemon_name_bgr(image, lang, similarity_threshold, size_tolerance, False,
+                                               timings, ocr_options)
+    finally:
+        # Plus aucune vue sur le segment avant close() (une trace d'exception peut
+        # encore en garder une : le segment est alors libéré avec le processus)
+        image = None
+        try:
+            shm.close()
+        except BufferError:
+            pass
+    timings['scan_ms'] = (time.perf_counter() - start) * 1000
+    return results, timings
+
+
+class ScanWorkerPool:
+    """
+    Pool de processus exécutant des scans complets (OCR + correspondance)
+
+    Args:
+        workers: Nombre de processus (défaut : nombre de cœurs)
+        threads_per_worker: Threads torch par worker (défaut : cœurs / workers)
+        warmup_langs: Langues dont le Reader est chargé au démarrage de chaque worker
+        max_pending: Scans en cours ou en attente au-delà desquels submit lève SchedulerBusy
+        reader_factory: Fonction (langs, gpu) -> Reader, importable par les workers
+    """
+
+    def __init__(self, workers=None, threads_per_worker=None, warmup_langs=(), max_pending=None,
+                 reader_factory=None):
+        cpus = os.cpu_count() or 1
+        self.workers = max(1, int(workers or cpus))
+        self.threads_per_worker = max(1, int(threads_per_worker or cpus // self.workers))
+        self.max_pending = max_pending or self.workers * 4
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(self.threads_per_worker, list(warmup_langs), reader_factory),
+        )
+
+    @classmethod
+    def from_env(cls):
+        """Construit le pool à partir de SCANNER_WORKERS et SCANNER_WORKER_THREADS"""
+        threads = os.environ.get('SCANNER_WORKER_THREADS')
+        langs = [l.strip() for l in os.environ.get('SCANNER_WARMUP_LANGS', '').split(',') if l.strip()]
+        return cls(
+            workers=int(os.environ.get('SCANNER_WORKERS', '0')) or None,
+            threads_per_worker=int(threads) if threads else None,
+            warmup_langs=langs,
+        )
+
+    @property
+    def pending(self):
+        """Scans soumis et pas encore terminés"""
+        return self._pending
+
+    def warmup(self):
+        """Démarre tous les workers (et leurs Readers) sans attendre la première image"""
+        for future in [self._executor.submit(time.sleep, 0) for _ in range(self.workers)]:
+            future.result()
+
+    def submit(self, image, lang='en', similarity_threshold=72, size_tolerance=0.3, grid_mode=False,
+               **ocr_options):
+        """
+        Envoie une image BGR décodée à un worker
+
+        L'image est copiée une fois dans un segment de mémoire partagée, libéré
+        à la fin du scan.
+
+        Returns:
+            Future de (résultats de détection ou None, timings en ms)
+
+        Raises:
+            SchedulerBusy: si max_pending scans sont déjà en cours
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise SchedulerBusy(f"{self._pending} scans déjà en cours dans les workers")
+            self._pending += 1
+
+        shm = None
+        try:
+            shm = shared_memory.SharedMemory(create=True, size=max(1, image.nbytes))
+            shared = np.ndarray(image.shape, dtype=image.dtype, buffer=shm.buf)
+            # Copie unique (les vues inversées RGB→BGR deviennent contiguës ici)
+            np.copyto(shared, image)
+            del shared
+            ref = (shm.name, image.shape, image.dtype.str)
+            future = self._executor.submit(_scan_task, ref, lang, similarity_threshold, size_tolerance,
+                                           grid_mode, ocr_options)
+        except BaseException:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+            with self._lock:
+                self._pending -= 1
+            raise
+
+        def release(_):
+            shm.close()
+            shm.unlink()
+            with self._lock:
+                self._pending -= 1
+
+        future.add_done_callback(release)
+        return future
+
+    def scan(self, image, *args, **kwargs):
+        """Version bloquante de submit : retourne (résultats, timings)"""
+        return self.submit(image, *args, **kwargs).result()
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_worker_pool():
+    """
+    Retourne le pool de processus partagé, ou None si SCANNER_WORKERS vaut 0 / n'est pas défini
+    (les scans restent alors dans le processus courant)
+    """
+    global _default_pool
+    if int(os.environ.get('SCANNER_WORKERS', '0') or 0) <= 0:
+        return None
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ScanWorkerPool.from_env()
+        return _default_pool